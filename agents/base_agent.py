@@ -1,7 +1,11 @@
-import random
 import math
 from collections import defaultdict
 import pickle
+from agents.q_table import DenseQTable
+from agents.model_format import is_binary_model, load_binary
+from utils.parameters import _BINS_PER_DIMENSION
+from utils.uniform_stream import UniformStream
+import numpy as np
 
 
 class BaseAgent:
@@ -10,6 +14,8 @@ class BaseAgent:
         Initialize the base agent with dynamic parameters.
         :param actions: List of available actions.
         :param kwargs: Dynamic parameters such as epsilon, alpha, etc.
+                       Pass ``dense=True`` to store the Q-table in a NumPy array shaped on ``bins_per_dimension``
+                       and ``seed`` to make the exploration reproducible (see set_seed).
         """
         self.actions = actions
 
@@ -22,9 +28,17 @@ class BaseAgent:
         self.alpha_decay = kwargs.get("alpha_decay", 0.99)
         self.gamma = kwargs.get("gamma", 0.99)
 
+        self.dense = kwargs.get("dense", False)
+        self.bins_per_dimension = kwargs.get("bins_per_dimension", _BINS_PER_DIMENSION)
+
         self.steps_done = 0
-        self.visit_count = defaultdict(int)  # Visit count for Q-learning
-        self.q_table = defaultdict(float)  # Default Q-table
+        self.set_seed(kwargs.get("seed"))
+        if self.dense:
+            self.visit_count = DenseQTable(self.bins_per_dimension, actions, dtype=np.uint32)
+            self.q_table = DenseQTable(self.bins_per_dimension, actions)
+        else:
+            self.visit_count = defaultdict(int)  # Visit count for Q-learning
+            self.q_table = defaultdict(float)  # Default Q-table
 
     def update_parameters(self, **kwargs):
         """
@@ -36,6 +50,15 @@ class BaseAgent:
                 setattr(self, key, value)
 
 
+    def set_seed(self, seed=None):
+        """
+        Re-creates the agent's own exploration generator.
+        :param seed: Int, numpy.random.SeedSequence (e.g. one of SeedSequence.spawn for independent
+                     worker streams), or None for fresh entropy.
+        """
+        self.rng = np.random.default_rng(seed)
+        self._uniforms = UniformStream(self.rng)  # Exploration draws, a plain list read per step
+
     def get_action(self, state):
         """
         Chooses an action based on epsilon-greedy policy.
@@ -45,14 +68,12 @@ class BaseAgent:
         eps_threshold = self.epsilon_end + (self.epsilon_start - self.epsilon_end) * math.exp(-1.0 * self.steps_done / self.epsilon_decay)
         self.steps_done += 1
 
-        threshold = random.uniform(0, 1)
+        threshold = self._uniforms.next()
 
         if threshold < eps_threshold:
-            return random.choice(self.actions)  # Explore
+            return self.actions[int(self._uniforms.next() * len(self.actions))]  # Explore
         else:
-            q_values = [self.q_table[(state, action)] for action in self.actions]
-            max_q = max(q_values)
-            return self.actions[q_values.index(max_q)]  # Exploit
+            return self.get_best_action(state)  # Exploit
 
     def get_best_action(self, state):
         """
@@ -60,13 +81,63 @@ class BaseAgent:
         :param state: Current state.
         :return: Best action.
         """
-        q_values = [self.q_table[(state, action)] for action in self.actions]
+        if self.dense:
+            return self.q_table.best_action(state)
+        q_values = [self.q_table.get((state, action), 0.0) for action in self.actions]  # .get does not insert missing entries
         max_q = max(q_values)
         return self.actions[q_values.index(max_q)]
 
-    def observe(self, state, action, reward, next_state):
+    def get_best_actions(self, states):
+        """
+        Chooses the best action for a batch of states with one vectorized argmax.
+        Ties go to the first action, as in get_best_action.
+        :param states: Sequence or (N x dimensions) array of discretized states, or an array of integer state ids (dense only).
+        :return: NumPy array of actions.
+        """
+        if self.dense:
+            return self.q_table.best_actions(states)
+        if isinstance(states, np.ndarray):
+            states = map(tuple, states.tolist())
+        # .get does not insert the missing (state, action) pairs, unlike indexing the defaultdict
+        q_values = np.array(
+            [[self.q_table.get((state, action), 0.0) for action in self.actions] for state in states], dtype=np.float64
+        ).reshape(-1, len(self.actions))  # (0 x actions) for an empty batch, so argmax still works
+        return np.asarray(self.actions)[q_values.argmax(axis=1)]
+
+    def get_actions(self, states, rng=None):
+        """
+        Epsilon-greedy actions for a batch of states, as if get_action were called on each of them in order.
+        :param states: Batch of states (see get_best_actions).
+        :param rng: numpy.random.Generator for exploration (by default the agent's own generator).
+        :return: NumPy array of actions.
+        """
+        if rng is None:
+            rng = self.rng
+        greedy = self.get_best_actions(states)
+        n = len(greedy)
+
+        steps = self.steps_done + np.arange(n)
+        eps_thresholds = self.epsilon_end + (self.epsilon_start - self.epsilon_end) * np.exp(-1.0 * steps / self.epsilon_decay)
+        self.steps_done += n
+
+        explore = rng.random(n) < eps_thresholds
+        random_actions = np.asarray(self.actions)[rng.integers(len(self.actions), size=n)]
+        return np.where(explore, random_actions, greedy)
+
+    def get_max_q(self, state):
+        """
+        Returns the highest Q-value available in a state.
+        :param state: Current state.
+        :return: Max Q-value.
+        """
+        if self.dense:
+            return self.q_table.max_value(state)
+        return max([self.q_table.get((state, action), 0.0) for action in self.actions])
+
+    def observe(self, state, action, reward, next_state, done=False):
         """
         Updates the Q-value. To be implemented by subclasses.
+        :param done: Whether next_state ends the episode (used by experience replay).
         """
         raise NotImplementedError("The 'observe' method must be implemented in a subclass.")
 
@@ -76,22 +147,30 @@ class BaseAgent:
         """
         self.alpha = max(self.alpha_end, self.alpha * self.alpha_decay)
 
+    def get_parameters(self):
+        """
+        Returns the hyperparameters stored alongside the Q-table in saved models.
+        """
+        return {
+            "epsilon_start": self.epsilon_start,
+            "epsilon_end": self.epsilon_end,
+            "epsilon_decay": self.epsilon_decay,
+            "alpha": self.alpha,
+            "alpha_end": self.alpha_end,
+            "alpha_decay": self.alpha_decay,
+            "gamma": self.gamma,
+            "bins_per_dimension": list(self.bins_per_dimension),  # Discretization the Q-table is keyed on
+        }
+
     def save(self, filepath):
         """
         Save the Q-table and agent parameters to a file.
         :param filepath: Path to the file where the Q-table will be saved.
         """
         data = {
-            "q_table": dict(self.q_table),  # Convert defaultdict to regular dict
-            "parameters": {
-                "epsilon_start": self.epsilon_start,
-                "epsilon_end": self.epsilon_end,
-                "epsilon_decay": self.epsilon_decay,
-                "alpha": self.alpha,
-                "alpha_end": self.alpha_end,
-                "alpha_decay": self.alpha_decay,
-                "gamma": self.gamma,
-            },
+            # Same layout for both tables: zero-valued entries are left out, they load back as the default 0.0
+            "q_table": self.q_table.to_dict() if self.dense else {key: value for key, value in self.q_table.items() if value != 0.0},
+            "parameters": self.get_parameters(),
         }
         with open(filepath, "wb") as f:
             pickle.dump(data, f)
@@ -99,11 +178,23 @@ class BaseAgent:
     def load(self, filepath):
         """
         Load the Q-table and agent parameters from a file.
+        Binary models (see agents.model_format) are memory-mapped and always load as a dense table.
         :param filepath: Path to the file where the Q-table is stored.
         """
+        if is_binary_model(filepath):
+            load_binary(self, filepath)
+            return
         with open(filepath, "rb") as f:
             data = pickle.load(f)
-        self.q_table = defaultdict(float, data["q_table"])
+        # Models saved before the bins were stored use the default discretization
+        bins_per_dimension = list(data["parameters"].get("bins_per_dimension", _BINS_PER_DIMENSION))
+        if self.dense and bins_per_dimension != list(self.bins_per_dimension):
+            self.visit_count = DenseQTable(bins_per_dimension, self.actions, dtype=np.uint32)
+        self.bins_per_dimension = bins_per_dimension
+        if self.dense:
+            self.q_table = DenseQTable.from_dict(self.bins_per_dimension, self.actions, data["q_table"])
+        else:
+            self.q_table = defaultdict(float, data["q_table"])
         for key, value in data["parameters"].items():
             if hasattr(self, key):
                 setattr(self, key, value)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Compaction of tuple-keyed Q-tables and occupancy reports per discretizer dimension.
+
+Models saved before lookups stopped inserting entries contain one zero-valued entry for every
+(state, action) that was only read. A zero entry holds the same value as a missing one (the
+Q-table defaults to 0.0), so dropping it is lossless.
+
+Usage:
+    python -m agents.compaction models/*/*.pkl            # report only
+    python -m agents.compaction --write models/*/*.pkl    # rewrite the files compacted
+"""
+import argparse
+import os
+import pickle
+from collections import Counter, defaultdict
+import numpy as np
+from agents.model_format import is_binary_model
+from utils.parameters import _BINS_PER_DIMENSION
+
+DIMENSION_NAMES = ["ball_x", "ball_y", "velocity_x", "velocity_y", "left_paddle_y", "right_paddle_y"]
+
+
+def compact_q_table(q_table, visit_count=None):
+    """
+    Returns a copy of a ``{(state, action): value}`` table without the never-updated entries:
+    zero values with no visits (with no visit counts, every zero value).
+    """
+    visit_count = visit_count or {}
+    return {key: value for key, value in q_table.items() if value != 0.0 or visit_count.get(key, 0) > 0}
+
+
+def compact_agent(agent):
+    """
+    Compacts the Q-table of a tuple-keyed agent in place (dense tables have a fixed size).
+    :return: Tuple (entries before, entries after).
+    """
+    before = len(agent.q_table)
+    if not agent.dense:
+        agent.q_table = defaultdict(float, compact_q_table(agent.q_table, agent.visit_count))
+    return before, len(agent.q_table)
+
+
+def occupancy(q_table, bins_per_dimension=None):
+    """
+    Counts how many distinct states of a table use each bin of each dimension.
+    :param q_table: ``{(state, action): value}`` table (only states with a non-zero entry count).
+    :param bins_per_dimension: Bins of the discretizer (defaults to _BINS_PER_DIMENSION).
+    :return: Dict with the number of states, the size of the state space and, per dimension,
+             the bins in use and the states per bin value.
+    """
+    bins_per_dimension = bins_per_dimension or _BINS_PER_DIMENSION
+    states = {state for (state, _), value in q_table.items() if value != 0.0}
+    dimensions = []
+    for i, bins in enumerate(bins_per_dimension):
+        counts = Counter(state[i] for state in states)
+        dimensions.append({
+            "dimension": DIMENSION_NAMES[i] if i < len(DIMENSION_NAMES) else str(i),
+            "slots": bins + 2,  # Values -1..bins, as in DenseQTable
+            "used": len(counts),
+            "counts": dict(sorted(counts.items())),
+        })
+    return {
+        "states": len(states),
+        "num_states": int(np.prod([bins + 2 for bins in bins_per_dimension])),
+        "dimensions": dimensions,
+    }
+
+
+def format_occupancy(report):
+    """
+    Formats an occupancy report as text, one line per dimension.
+    """
+    lines = [f"  states: {report['states']} / {report['num_states']} ({100 * report['states'] / report['num_states']:.1f}%)"]
+    for dimension in report["dimensions"]:
+        counts = " ".join(f"{value}:{count}" for value, count in dimension["counts"].items())
+        lines.append(f"  {dimension['dimension']:<15} {dimension['used']:>2}/{dimension['slots']} bins  {counts}")
+    return "\n".join(lines)
+
+
+def compact_model(path, write=False):
+    """
+    Compacts a pickled model and reports its occupancy.
+    :param write: Rewrite the file (through a temporary file) instead of only reporting.
+    :return: Dict with entries and file sizes before and after, and the occupancy report.
+    """
+    size_before = os.path.getsize(path)
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    q_table = data["q_table"]
+    compacted = compact_q_table(q_table, data.get("visit_count"))
+    data["q_table"] = compacted
+    payload = pickle.dumps(data)
+
+    if write:
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+
+    return {
+        "entries_before": len(q_table),
+        "entries_after": len(compacted),
+        "size_before": size_before,
+        "size_after": len(payload),
+        "occupancy": occupancy(compacted, data["parameters"].get("bins_per_dimension")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop never-updated Q-table entries and report the table occupancy.")
+    parser.add_argument("paths", nargs="+", help="Pickled models")
+    parser.add_argument("--write", action="store_true", help="Rewrite the files compacted")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if is_binary_model(path):
+            print(f"{path}: binary model, skipped (dense tables have a fixed size)")
+            continue
+        result = compact_model(path, args.write)
+        print(
+            f"{path}: {result['entries_before']} -> {result['entries_after']} entries, "
+            f"{result['size_before'] / 1e6:.1f} -> {result['size_after'] / 1e6:.1f} MB{'' if args.write else ' (not written)'}"
+        )
+        print(format_occupancy(result["occupancy"]))
+
+
+if __name__ == "__main__":
+    main()
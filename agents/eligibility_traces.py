@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class EligibilityTraces:
+    """
+    Replacing eligibility traces over at most ``capacity`` (state, action) pairs of a DenseQTable.
+
+    The flat cell index of each pair, its trace and its visit factor 1 / (1 + visits) live in
+    preallocated NumPy arrays, so one update of every traced pair is a handful of vectorized
+    operations whatever the episode length. When all slots are taken, the pair with the smallest
+    trace is evicted.
+    """
+    def __init__(self, capacity):
+        """
+        :param capacity: Maximum number of traced (state, action) pairs.
+        """
+        self.capacity = capacity
+        self.cells = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.inverse_visits = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self._slots = {}  # cell -> slot
+        self._scratch = np.zeros(capacity, dtype=np.float64)
+
+    def visit(self, cell, visits):
+        """
+        Sets the trace of a pair to 1, adding the pair if it is not traced yet.
+        :param cell: Flat index of the pair (state row * number of actions + action column).
+        :param visits: Visit count of the pair, including the current visit.
+        """
+        slot = self._slots.get(cell)
+        if slot is None:
+            if self.size < self.capacity:
+                slot = self.size
+                self.size += 1
+            else:
+                slot = int(self.values.argmin())
+                del self._slots[int(self.cells[slot])]
+            self._slots[cell] = slot
+            self.cells[slot] = cell
+        self.values[slot] = 1.0
+        self.inverse_visits[slot] = 1.0 / (1 + visits)
+
+    def update(self, q_values, delta, alpha, alpha_end, decay):
+        """
+        Moves every traced Q-value by max(alpha_end, alpha / (1 + visits)) * delta * trace, then
+        decays the traces (the same learning rate the one-step agents use).
+        :param q_values: ``values`` array of the agent's DenseQTable.
+        :param delta: TD error of the current transition.
+        :param decay: Trace decay factor (gamma * lambda).
+        """
+        n = self.size
+        traces = self.values[:n]
+        step = self._scratch[:n]
+        np.multiply(self.inverse_visits[:n], alpha, out=step)
+        np.maximum(step, alpha_end, out=step)
+        step *= traces
+        step *= delta
+        q_cells = q_values.reshape(-1)
+        q_cells[self.cells[:n]] += step
+        traces *= decay
+
+    def clear(self):
+        """
+        Drops every trace (end of episode, or a non-greedy action in Watkins's Q(lambda)).
+        """
+        self.size = 0
+        self._slots.clear()
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,54 @@
+from utils.discretizer import Discretizer
+from utils.symmetry import StateMirror
+
+
+class MirroredAgent:
+    """
+    The right-paddle side of an agent that plays from the left.
+
+    Every state is mirrored (see utils.symmetry.StateMirror) before it reaches the shared agent,
+    so a single Q-table plays both paddles and, in self-play, learns from the transitions of both
+    players. Pass it as the right agent with the shared agent on the left:
+
+        train_double_agent(env, agent, MirroredAgent(agent), episodes)
+
+    Every other attribute (q_table, steps_done, save, ...) is the shared agent's.
+    """
+    def __init__(self, agent, state_ranges=None):
+        """
+        :param agent: Shared agent, trained from the left paddle's point of view.
+        :param state_ranges: Ranges of the environment's Discretizer, if any.
+        """
+        if hasattr(agent, "traces"):
+            raise ValueError("Eligibility traces belong to one episode of one paddle: lambda agents cannot be shared.")
+        self.agent = agent
+        self.mirror = StateMirror(Discretizer(agent.bins_per_dimension, state_ranges))
+
+    def __getattr__(self, name):
+        if name == "agent":  # Not set yet while unpickling
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+
+    def set_seed(self, seed=None):
+        """
+        Does nothing: the exploration generator belongs to the shared agent.
+        """
+
+    def get_action(self, state):
+        return self.agent.get_action(self.mirror.mirror(state))
+
+    def get_best_action(self, state):
+        return self.agent.get_best_action(self.mirror.mirror(state))
+
+    def get_best_actions(self, states):
+        return self.agent.get_best_actions(self.mirror.mirror_batch(states))
+
+    def get_actions(self, states, rng=None):
+        return self.agent.get_actions(self.mirror.mirror_batch(states), rng)
+
+    def get_max_q(self, state):
+        return self.agent.get_max_q(self.mirror.mirror(state))
+
+    def observe(self, state, action, reward, next_state, done=False):
+        mirror = self.mirror.mirror
+        self.agent.observe(mirror(state), action, reward, mirror(next_state), done)
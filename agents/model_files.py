@@ -0,0 +1,47 @@
+"""
+The saved models on disk: the directory of each agent type, the class that loads it, and the scan
+of the directories shared by the GUI registry, the tournament and the sweep.
+
+A model file is ``<name>_left`` or ``<name>_right`` followed by ``.pkl``, ``.qbin`` or ``.policy.npy``.
+"""
+import os
+import re
+from agents.qlearning_angent import QLearningAgent
+from agents.sarsa_agent import SARSAAgent
+from agents.model_format import BINARY_EXTENSION
+from agents.policy_agent import POLICY_EXTENSION, is_policy_file
+
+MODEL_DIRS = {"qlearning": "models/qlearning_models", "sarsa": "models/sarsa_models"}
+AGENT_CLASSES = {"qlearning": QLearningAgent, "sarsa": SARSAAgent}
+MODEL_EXTENSIONS = (".pkl", BINARY_EXTENSION, POLICY_EXTENSION)
+
+
+def scan_models(model_dirs=None):
+    """
+    Lists the saved models of every agent type.
+    :param model_dirs: Dict agent type -> directory (defaults to MODEL_DIRS).
+    :return: List of dicts with name, path, agent_type, side, episodes (last number of the name,
+             or None), size and mtime, sorted by name.
+    """
+    models = []
+    for agent_type, directory in (model_dirs or MODEL_DIRS).items():
+        if not os.path.exists(directory):
+            continue
+        for entry in os.scandir(directory):
+            stem, extension = os.path.splitext(entry.name)
+            if is_policy_file(entry.name):
+                stem, extension = entry.name[:-len(POLICY_EXTENSION)], POLICY_EXTENSION
+            if extension not in MODEL_EXTENSIONS or not stem.endswith(("_left", "_right")):
+                continue
+            stat = entry.stat()
+            episodes = re.findall(r"\d+", stem)
+            models.append({
+                "name": entry.name,
+                "path": entry.path,
+                "agent_type": agent_type,
+                "side": "left" if stem.endswith("_left") else "right",
+                "episodes": int(episodes[-1]) if episodes else None,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+            })
+    return sorted(models, key=lambda model: model["name"])
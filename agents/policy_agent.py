@@ -0,0 +1,99 @@
+"""
+Greedy policies exported as lookup tables, and the agent that plays them.
+
+Once training is over the policy is static, so export_policy stores the greedy action of every
+discretized state: one uint8 per state in a ``.policy.npy`` file whose shape is the state space
+of DenseQTable (``bins + 2`` values per dimension), which also gives back the bins. PolicyAgent
+memory-maps the file and answers with a single index, in place of QLearningAgent / SARSAAgent
+wherever a trained agent only plays (test_double_agent, the GUI, the tournament).
+
+Usage: python -m agents.policy_agent models/qlearning_models/*.pkl
+writes ``<model>.policy.npy`` next to each model.
+"""
+import os
+import sys
+import numpy as np
+from agents.q_table import DenseQTable
+from utils.discretizer import Discretizer
+
+POLICY_EXTENSION = ".policy.npy"
+
+
+def is_policy_file(filepath):
+    return filepath.endswith(POLICY_EXTENSION)
+
+
+def greedy_policy(agent):
+    """
+    Returns the greedy action of every state of an agent, ties going to the first action as in get_best_action.
+    :return: uint8 array shaped like the state space (``bins + 2`` values per dimension).
+    """
+    bins = list(agent.bins_per_dimension)
+    q_table = agent.q_table if agent.dense else DenseQTable.from_dict(bins, agent.actions, agent.q_table)
+    actions = np.asarray(q_table.actions, dtype=np.uint8)[q_table.values.argmax(axis=1)]
+    return actions.reshape([b + 2 for b in bins])
+
+
+def export_policy(agent, filepath):
+    """
+    Saves the greedy policy of an agent.
+    :param filepath: Destination path, conventionally ending in ``.policy.npy``.
+    """
+    np.save(filepath, greedy_policy(agent))
+
+
+class PolicyAgent:
+    """
+    Plays a policy exported by export_policy. It does not learn: get_action is the greedy action.
+    """
+    def __init__(self, filepath):
+        """
+        :param filepath: Path of the ``.policy.npy`` file (memory-mapped, nothing is copied).
+        """
+        policy = np.load(filepath, mmap_mode="r")
+        self.bins_per_dimension = [size - 2 for size in policy.shape]
+        self.policy = policy.reshape(-1)
+        self.dense = True
+        self._actions = memoryview(self.policy)  # Scalar reads as plain Python ints
+        self._discretizer = Discretizer(self.bins_per_dimension)
+        self._index_cache = {}  # state tuple -> index, as the row cache of DenseQTable
+
+    def get_best_action(self, state):
+        """
+        :param state: Tuple with the discretized state, or an integer id from Discretizer.state_id.
+        """
+        if type(state) is not tuple:
+            return self._actions[state]
+        index = self._index_cache.get(state)
+        if index is None:
+            index = self._index_cache[state] = self._discretizer.encode(state)
+        return self._actions[index]
+
+    get_action = get_best_action
+
+    def get_best_actions(self, states):
+        """
+        Vectorized get_best_action.
+        :param states: 1-D array of integer ids, or a sequence / (N x dimensions) array of discretized states.
+        :return: NumPy array of actions.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        if states.ndim > 1:
+            states = self._discretizer.encode(states)
+        return self.policy[states]
+
+    def observe(self, state, action, reward, next_state, done=False):
+        """
+        Does nothing: an exported policy is static.
+        """
+
+
+if __name__ == "__main__":
+    from agents.qlearning_angent import QLearningAgent
+
+    for path in sys.argv[1:]:
+        agent = QLearningAgent()
+        agent.load(path)
+        policy_path = os.path.splitext(path)[0] + POLICY_EXTENSION
+        export_policy(agent, policy_path)
+        print(f"{path} -> {policy_path} ({os.path.getsize(policy_path) / 1e3:.0f} kB)")
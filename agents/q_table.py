@@ -0,0 +1,171 @@
+import numpy as np
+from utils.discretizer import Discretizer
+
+
+class DenseQTable:
+    """
+    Dense, NumPy-backed replacement for the tuple-keyed Q-table dictionary.
+
+    Each discretized state owns one row of ``len(actions)`` cells. Every dimension gets one extra
+    bin on both sides of ``bins_per_dimension``, because the Discretizer yields -1 for negative
+    velocities and for a ball that has just crossed a wall; values further out are clamped into
+    those edge bins.
+    """
+    def __init__(self, bins_per_dimension, actions, dtype=np.float32, values=None):
+        """
+        :param bins_per_dimension: Number of bins for each state dimension (as in the Discretizer).
+        :param actions: List of available actions.
+        :param dtype: NumPy dtype of the cells (float32 for Q-values, uint32 for visit counts).
+        :param values: Optional existing array of shape (num_states, len(actions)) to wrap.
+        """
+        self.bins_per_dimension = list(bins_per_dimension)
+        self.actions = list(actions)
+        self.shape = [bins + 2 for bins in self.bins_per_dimension] + [len(self.actions)]
+        self.num_states = int(np.prod(self.shape[:-1]))
+
+        if values is None:
+            values = np.zeros((self.num_states, len(self.actions)), dtype=dtype)
+        self.values = values
+        self._cells = memoryview(values.reshape(-1))  # Flat view: scalar reads/writes as plain Python numbers
+        self._num_actions = len(self.actions)
+
+        self._action_index = {action: i for i, action in enumerate(self.actions)}
+        self._discretizer = Discretizer(self.bins_per_dimension)  # Same mixed-radix encoding as Discretizer.encode
+        self._row_cache = {}  # state tuple -> row index, avoids recomputing the mixed-radix index
+
+    def state_index(self, state):
+        """
+        Returns the row index of a discretized state.
+        :param state: Tuple with the discretized state, or an integer id from Discretizer.state_id.
+        :return: Integer row index in ``values``.
+        """
+        if type(state) is int:
+            return state
+        index = self._row_cache.get(state)
+        if index is None:
+            if not isinstance(state, tuple):
+                return int(state)  # NumPy integer id
+            index = self._discretizer.encode(state)
+            self._row_cache[state] = index
+        return index
+
+    def state_indices(self, states):
+        """
+        Vectorized ``state_index`` for a batch of states.
+        :param states: 1-D array of integer ids, or a sequence / (N x dimensions) array of discretized states.
+        :return: NumPy int64 array of row indices.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        if states.ndim == 1:
+            return states
+        return self._discretizer.encode(states)
+
+    def row(self, state):
+        """
+        Returns the values of all actions for a state as a view on the table.
+        :param state: Tuple with the discretized state.
+        :return: NumPy array of length ``len(actions)``.
+        """
+        return self.values[self.state_index(state)]
+
+    def best_action(self, state):
+        """
+        Returns the action with the highest value, ties going to the first action (like ``list.index(max)``).
+        """
+        return self.actions[int(self.values[self.state_index(state)].argmax())]
+
+    def best_actions(self, states):
+        """
+        Vectorized ``best_action``: one argmax over the rows of a batch of states, with the same first-max ties.
+        :return: NumPy array of actions.
+        """
+        return np.asarray(self.actions)[self.values[self.state_indices(states)].argmax(axis=1)]
+
+    def max_value(self, state):
+        """
+        Returns the highest value over all actions of a state.
+        """
+        start = self.state_index(state) * self._num_actions
+        return max(self._cells[start:start + self._num_actions])
+
+    def state_from_index(self, index):
+        """
+        Inverse of ``state_index``. Clamped values map back to the edge bins.
+        :param index: Row index in ``values``.
+        :return: Tuple with the discretized state.
+        """
+        return self._discretizer.decode(index)
+
+    def to_dict(self):
+        """
+        Converts the non-zero cells to the ``{(state, action): value}`` layout used by the pickled models.
+        """
+        rows, cols = np.nonzero(self.values)
+        return {
+            (self.state_from_index(int(row)), self.actions[int(col)]): self.values[row, col].item()
+            for row, col in zip(rows, cols)
+        }
+
+    @classmethod
+    def from_dict(cls, bins_per_dimension, actions, mapping, dtype=np.float32):
+        """
+        Builds a table from a ``{(state, action): value}`` dictionary (see update).
+        """
+        table = cls(bins_per_dimension, actions, dtype=dtype)
+        table.update(mapping)
+        return table
+
+    def update(self, mapping):
+        """
+        Fills the table from a ``{(state, action): value}`` dictionary.
+
+        States outside [-1, bins] are clamped into the edge rows, which belong to in-range states:
+        they are written first, and a row whose in-range state is in the dictionary is then reset to
+        that state's own entries, so every state of the dictionary reads back as it did there.
+        Every conversion of a dictionary table (loading models, export, serving) goes through here.
+        """
+        if not mapping:
+            return
+        keys = list(mapping)
+        states = np.array([state for state, _ in keys], dtype=np.int64)
+        rows = self.state_indices(states)
+        cols = np.array([self._action_index[action] for _, action in keys], dtype=np.int64)
+        values = np.array([mapping[key] for key in keys], dtype=self.values.dtype)
+        if states.ndim == 1:  # Integer ids are always in range
+            in_range = np.ones(len(keys), dtype=bool)
+        else:
+            in_range = ((states >= -1) & (states <= np.asarray(self.bins_per_dimension))).all(axis=1)
+
+        outside = ~in_range
+        for row, col, value in zip(rows[outside].tolist(), cols[outside].tolist(), values[outside]):
+            self.values[row, col] = value  # In dictionary order, as the key-by-key fill did
+        self.values[rows[in_range]] = 0
+        self.values[rows[in_range], cols[in_range]] = values[in_range]  # Unique cells
+
+    def get(self, key, default=0.0):
+        """
+        Same as ``table[key]``; mirrors ``dict.get`` so the agents can use one lookup for both tables.
+        Every (state, action) has a cell, so ``default`` is never returned.
+        """
+        return self[key]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_cells"]  # memoryviews cannot be pickled, rebuilt in __setstate__
+        state["_row_cache"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cells = memoryview(self.values.reshape(-1))
+
+    def __getitem__(self, key):
+        state, action = key
+        return self._cells[self.state_index(state) * self._num_actions + self._action_index[action]]
+
+    def __setitem__(self, key, value):
+        state, action = key
+        self._cells[self.state_index(state) * self._num_actions + self._action_index[action]] = value
+
+    def __len__(self):
+        return int(np.count_nonzero(self.values))
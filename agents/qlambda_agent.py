@@ -0,0 +1,50 @@
+from agents.eligibility_traces import EligibilityTraces
+from agents.qlearning_angent import QLearningAgent
+from utils.parameters import LAMBDA_Parameters
+
+
+class QLambdaAgent(QLearningAgent):
+    """
+    Watkins's Q(lambda): Q-learning whose TD error also updates the recently visited (state, action)
+    pairs, weighted by their eligibility traces. Traces are cut when a non-greedy action is taken
+    and at the end of every episode.
+    """
+    def __init__(self, **kwargs):
+        """
+        Initialize the Q(lambda) agent. The Q-table is dense unless ``dense=False`` is passed, which is rejected.
+        :param kwargs: Parameters to override defaults from Q_Parameters and LAMBDA_Parameters.
+        """
+        params = LAMBDA_Parameters.copy()
+        params["dense"] = True
+        params.update(kwargs)
+        if not params["dense"] or params.get("replay", False):
+            raise ValueError("QLambdaAgent requires a dense Q-table (dense=True) and no experience replay.")
+        super().__init__(**params)
+
+        self.trace_lambda = params["trace_lambda"]
+        self.trace_length = params["trace_length"]
+        self.traces = EligibilityTraces(self.trace_length)
+
+    def observe(self, state, action, reward, next_state, done=False):
+        """
+        Applies the Q-learning TD error to every traced pair, with visit-adjusted learning rates.
+        """
+        # An exploratory action ends the greedy trajectory the traces follow
+        if self.q_table[(state, action)] < self.get_max_q(state):
+            self.traces.clear()
+
+        self.visit_count[(state, action)] += 1
+
+        delta = reward + self.gamma * self.get_max_q(next_state) - self.q_table[(state, action)]
+        cell = self.q_table.state_index(state) * len(self.actions) + self.actions.index(action)
+        self.traces.visit(cell, self.visit_count[(state, action)])
+        self.traces.update(self.q_table.values, delta, self.alpha, self.alpha_end, self.gamma * self.trace_lambda)
+        if done:
+            self.traces.clear()
+
+        self.update_learning_rate()
+
+    def get_parameters(self):
+        parameters = super().get_parameters()
+        parameters.update(trace_lambda=self.trace_lambda, trace_length=self.trace_length)
+        return parameters
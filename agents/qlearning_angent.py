@@ -1,19 +1,39 @@
 from agents.base_agent import BaseAgent
-from utils.parameters import Q_Parameters, _ACTIONS
+from agents.replay_buffer import ReplayBuffer
+from utils.parameters import Q_Parameters, REPLAY_Parameters, _ACTIONS
+import numpy as np
 
 class QLearningAgent(BaseAgent):
     def __init__(self, **kwargs):
         """
         Initialize the Q-Learning agent with default or provided parameters.
         :param kwargs: Parameters to override defaults from Q_Parameters.
+                       Pass ``replay=True`` (dense agents only) to also learn from mini-batches of past
+                       transitions, configured by the keys of REPLAY_Parameters.
         """
         params = Q_Parameters.copy()  # Use defaults
         params.update(kwargs)  # Override with dynamic parameters
         super().__init__(actions=_ACTIONS, **params)
 
-    def observe(self, state, action, reward, next_state):
+        self.replay = None
+        if params.get("replay", False):
+            if not self.dense:
+                raise ValueError("Experience replay requires a dense Q-table (dense=True).")
+            replay_params = REPLAY_Parameters.copy()
+            replay_params.update({key: value for key, value in params.items() if key in REPLAY_Parameters})
+            self.replay = ReplayBuffer(replay_params["replay_capacity"], seed=self.rng)  # Shares the agent's generator
+            self.replay_batch_size = replay_params["replay_batch_size"]
+            self.replay_interval = replay_params["replay_interval"]
+
+    def set_seed(self, seed=None):
+        super().set_seed(seed)
+        if getattr(self, "replay", None) is not None:  # Not created yet when called from BaseAgent.__init__
+            self.replay.rng = self.rng
+
+    def observe(self, state, action, reward, next_state, done=False):
         """
         Update the Q-value using the Bellman equation and adjust learning rate based on visit count.
+        With experience replay enabled, the transition is also stored and a mini-batch is replayed.
         """
         # Increment visit count
         self.visit_count[(state, action)] += 1
@@ -24,9 +44,32 @@ class QLearningAgent(BaseAgent):
 
         # Update Q-value using the adjusted learning rate
         old_q = self.q_table[(state, action)]
-        next_max = max([self.q_table[(next_state, a)] for a in self.actions])
+        next_max = self.get_max_q(next_state)
         new_q = old_q + adjusted_alpha * (reward + self.gamma * next_max - old_q)
         self.q_table[(state, action)] = new_q
 
+        if self.replay is not None:
+            self.replay.add(
+                self.q_table.state_index(state), self.actions.index(action), reward,
+                self.q_table.state_index(next_state), done,
+            )
+            if self.steps_done % self.replay_interval == 0 and len(self.replay) >= self.replay_batch_size:
+                self.replay_update()
+
         # Update epsilon or any other time-dependent parameters
         self.update_learning_rate()
+
+    def replay_update(self):
+        """
+        Applies one vectorized Q-learning update to a mini-batch sampled from the replay buffer.
+        Terminal transitions do not bootstrap; visit counts are left untouched.
+        """
+        states, actions, rewards, next_states, dones = self.replay.sample(self.replay_batch_size)
+        q_values = self.q_table.values
+        visits = self.visit_count.values[states, actions]
+        adjusted_alpha = np.maximum(self.alpha_end, self.alpha / (1 + visits.astype(np.float32)))
+
+        next_max = q_values[next_states].max(axis=1)
+        targets = rewards + self.gamma * next_max * ~dones
+        old_q = q_values[states, actions]
+        q_values[states, actions] = old_q + adjusted_alpha * (targets - old_q)
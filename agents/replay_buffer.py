@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions stored in preallocated NumPy arrays.
+    States are stored as integer row indices of a DenseQTable, actions as column indices.
+    """
+    def __init__(self, capacity, seed=None):
+        """
+        :param capacity: Maximum number of transitions; the oldest ones are overwritten.
+        :param seed: Seed (or an existing numpy.random.Generator) used to sample mini-batches.
+        """
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Stores one transition, overwriting the oldest one when the buffer is full.
+        """
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Samples a mini-batch uniformly (with replacement).
+        :return: Tuple of arrays (states, actions, rewards, next_states, dones).
+        """
+        indices = self.rng.integers(0, self.size, size=batch_size)
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.dones[indices],
+        )
+
+    def __len__(self):
+        return self.size
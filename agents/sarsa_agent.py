@@ -14,7 +14,7 @@ class SARSAAgent(BaseAgent):
         params.update(kwargs)  # Override defaults with provided arguments
         super().__init__(actions=_ACTIONS, **params)
 
-    def observe(self, state, action, reward, next_state):
+    def observe(self, state, action, reward, next_state, done=False):
         """
         Update the Q-value using the SARSA update rule:
         Q(s, a) <- Q(s, a) + alpha * [reward + gamma * Q(s', a') - Q(s, a)]
@@ -31,7 +31,7 @@ class SARSAAgent(BaseAgent):
 
         # Compute the SARSA update
         old_q = self.q_table[(state, action)]
-        next_q = self.q_table[(next_state, next_action)]
+        next_q = self.q_table.get((next_state, next_action), 0.0)  # Lookup without inserting an entry
         new_q = old_q + adjusted_alpha * (reward + self.gamma * next_q - old_q)
         self.q_table[(state, action)] = new_q
 
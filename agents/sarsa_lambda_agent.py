@@ -0,0 +1,48 @@
+from agents.eligibility_traces import EligibilityTraces
+from agents.sarsa_agent import SARSAAgent
+from utils.parameters import LAMBDA_Parameters
+
+
+class SARSALambdaAgent(SARSAAgent):
+    """
+    SARSA(lambda): SARSA whose TD error also updates the recently visited (state, action) pairs,
+    weighted by their eligibility traces. Traces are cleared at the end of every episode.
+    """
+    def __init__(self, **kwargs):
+        """
+        Initialize the SARSA(lambda) agent. The Q-table is dense unless ``dense=False`` is passed, which is rejected.
+        :param kwargs: Parameters to override defaults from SARSA_Parameters and LAMBDA_Parameters.
+        """
+        params = LAMBDA_Parameters.copy()
+        params["dense"] = True
+        params.update(kwargs)
+        if not params["dense"]:
+            raise ValueError("SARSALambdaAgent requires a dense Q-table (dense=True).")
+        super().__init__(**params)
+
+        self.trace_lambda = params["trace_lambda"]
+        self.trace_length = params["trace_length"]
+        self.traces = EligibilityTraces(self.trace_length)
+
+    def observe(self, state, action, reward, next_state, done=False):
+        """
+        Applies the SARSA TD error to every traced pair, with visit-adjusted learning rates.
+        """
+        self.visit_count[(state, action)] += 1
+
+        # Choose the next action using epsilon-greedy policy
+        next_action = self.get_action(next_state)
+
+        delta = reward + self.gamma * self.q_table[(next_state, next_action)] - self.q_table[(state, action)]
+        cell = self.q_table.state_index(state) * len(self.actions) + self.actions.index(action)
+        self.traces.visit(cell, self.visit_count[(state, action)])
+        self.traces.update(self.q_table.values, delta, self.alpha, self.alpha_end, self.gamma * self.trace_lambda)
+        if done:
+            self.traces.clear()
+
+        self.update_learning_rate()
+
+    def get_parameters(self):
+        parameters = super().get_parameters()
+        parameters.update(trace_lambda=self.trace_lambda, trace_length=self.trace_length)
+        return parameters
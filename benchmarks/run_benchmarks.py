@@ -0,0 +1,198 @@
+"""
+Training throughput benchmarks for the environment, the discretizer, the agents and the full loop.
+
+Every benchmark runs with fixed seeds and reports steps per second plus memory (Q-table entries
+and process RSS). Results are written as JSON, by default to benchmarks/results/<commit>.json,
+so runs from different commits can be compared with --compare.
+
+Usage: python benchmarks/run_benchmarks.py [--quick] [--output FILE] [--compare BASELINE.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from agents.qlearning_angent import QLearningAgent
+from agents.sarsa_agent import SARSAAgent
+from environments.pong_environment import MultiplayerPongEnv
+from training.train_double import train_double_agent
+
+SEED = 1234
+# (dense, state_ids) table configurations: dictionary on tuples, dense on tuples, dense on integer ids
+TABLE_CONFIGS = [(False, False), (True, False), (True, True)]
+
+
+def _random_actions(steps):
+    """
+    Returns ``steps`` seeded (left_action, right_action) pairs.
+    """
+    return [tuple(pair) for pair in np.random.default_rng(SEED).integers(3, size=(steps, 2)).tolist()]
+
+
+def _rss_mb():
+    """
+    Returns the current resident set size in MB (peak RSS where /proc is not available).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _result(name, steps, elapsed, **extra):
+    result = {
+        "name": name,
+        "steps": steps,
+        "seconds": round(elapsed, 4),
+        "steps_per_sec": round(steps / elapsed, 1),
+        "rss_mb": round(_rss_mb(), 1),
+    }
+    result.update(extra)
+    return result
+
+
+def _label(dense, state_ids):
+    return "[dense+state_ids]" if state_ids else "[dense]" if dense else ""
+
+
+def _record_transitions(steps, state_ids=False):
+    """
+    Plays random actions in the environment and records (state, actions, rewards, next_state).
+    :param state_ids: Record integer state ids instead of tuples.
+    """
+    env = MultiplayerPongEnv(headless=True, state_ids=state_ids, seed=SEED)
+    state = env.reset()
+    transitions = []
+    for actions in _random_actions(steps):
+        next_state, rewards, done, _ = env.step(actions)
+        transitions.append((state, actions, rewards, next_state))
+        state = env.reset() if done else next_state
+    return transitions
+
+
+def bench_env_step(steps):
+    env = MultiplayerPongEnv(headless=True, seed=SEED)
+    actions = _random_actions(steps)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    return _result("env_step", steps, time.perf_counter() - start)
+
+
+def bench_discretize(steps):
+    env = MultiplayerPongEnv(headless=True, seed=SEED)
+    states = []
+    for actions in _random_actions(steps):
+        _, _, done, _ = env.step(actions)
+        states.append(env._get_continuous_state().copy())
+        if done:
+            env.reset()
+    discretize = env.discretizer.discretize
+    start = time.perf_counter()
+    for state in states:
+        discretize(state)
+    return _result("discretize", steps, time.perf_counter() - start)
+
+
+def bench_observe(agent_class, transitions, dense, state_ids=False):
+    agent = agent_class(dense=dense, seed=SEED)
+    start = time.perf_counter()
+    for state, (action, _), (reward, _), next_state in transitions:
+        agent.observe(state, action, reward, next_state)
+    elapsed = time.perf_counter() - start
+    name = f"{agent_class.__name__}.observe" + _label(dense, state_ids)
+    return _result(name, len(transitions), elapsed, q_table_entries=len(agent.q_table))
+
+
+def bench_train_loop(episodes, dense, state_ids=False):
+    env = MultiplayerPongEnv(headless=True, state_ids=state_ids, seed=SEED)
+    agent_left = QLearningAgent(dense=dense, seed=SEED)
+    agent_right = SARSAAgent(dense=dense, seed=SEED + 1)
+    start = time.perf_counter()
+    train_double_agent(env, agent_left, agent_right, episodes=episodes, log_interval=episodes + 1)
+    elapsed = time.perf_counter() - start
+    return _result(
+        "train_double_agent" + _label(dense, state_ids),
+        agent_left.steps_done,
+        elapsed,
+        episodes=episodes,
+        episodes_per_sec=round(episodes / elapsed, 1),
+        q_table_entries=len(agent_left.q_table) + len(agent_right.q_table),
+    )
+
+
+def run_all(quick=False):
+    steps = 20000 if quick else 200000
+    episodes = 300 if quick else 3000
+    transitions = {state_ids: _record_transitions(steps, state_ids) for state_ids in (False, True)}
+    results = [bench_env_step(steps), bench_discretize(steps)]
+    for dense, state_ids in TABLE_CONFIGS:
+        results.append(bench_observe(QLearningAgent, transitions[state_ids], dense, state_ids))
+        results.append(bench_observe(SARSAAgent, transitions[state_ids], dense, state_ids))
+        results.append(bench_train_loop(episodes, dense, state_ids))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    """
+    Prints the steps/sec ratio of every benchmark against a previous JSON report.
+    """
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    for result in results:
+        old = baseline.get(result["name"])
+        if old:
+            ratio = result["steps_per_sec"] / old["steps_per_sec"]
+            print(f"{result['name']:<40} {old['steps_per_sec']:>12.1f} -> {result['steps_per_sec']:>12.1f}  x{ratio:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Run 10x fewer steps and episodes.")
+    parser.add_argument("--output", help="JSON report path (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Previous JSON report to compare against.")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    results = run_all(quick=args.quick)
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": SEED,
+        "quick": args.quick,
+        "results": results,
+    }
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        print(f"{result['name']:<40} {result['steps_per_sec']:>12.1f} steps/s  rss {result['rss_mb']} MB")
+    print(f"Report saved to {output}")
+    if args.compare:
+        compare(results, args.compare)
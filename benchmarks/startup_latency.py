@@ -0,0 +1,56 @@
+"""
+Measures the latency from a fresh interpreter to the first MultiplayerPongEnv.step,
+with and without rendering, and reports which heavy GUI modules got imported.
+
+Usage: python benchmarks/startup_latency.py [--repeats N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import time
+start = time.perf_counter()
+import sys
+from environments.pong_environment import MultiplayerPongEnv
+env = MultiplayerPongEnv(headless={headless})
+env.step((0, 0))
+{render}
+elapsed = time.perf_counter() - start
+print(elapsed, "pygame" in sys.modules, "matplotlib" in sys.modules)
+"""
+
+
+def measure(headless, repeats):
+    """
+    Runs the probe in fresh interpreters and returns the best import-to-first-step latency.
+    :param headless: Whether the environment is built in headless mode.
+    :param repeats: Number of fresh interpreters to start.
+    :return: Dictionary with the latency in milliseconds and the imported GUI modules.
+    """
+    code = _PROBE.format(headless=headless, render="" if headless else "env.render()")
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(output[-3]))
+    return {
+        "headless": headless,
+        "first_step_ms": round(min(timings) * 1000, 2),
+        "pygame_imported": output[-2] == "True",
+        "matplotlib_imported": output[-1] == "True",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    results = [measure(True, args.repeats), measure(False, args.repeats)]
+    print(json.dumps(results, indent=2))
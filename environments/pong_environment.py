@@ -1,18 +1,29 @@
-from utils.visualizer import Visualizer
 from utils.discretizer import Discretizer
 import gym
 from gym import spaces
 import numpy as np
-import random
-from utils.parameters import REWARD_Values
-import pygame
+from utils.parameters import REWARD_Values, _BINS_PER_DIMENSION
+from utils.uniform_stream import UniformStream
 
 class MultiplayerPongEnv(gym.Env):
     """
     Multiplayer Pong environment for training two agents simultaneously.
+    pygame is only imported when the environment is first rendered or read from the keyboard.
     """
-    def __init__(self):
+    def __init__(self, headless=False, state_ids=False, state_ranges=None, bins_per_dimension=None, seed=None,
+                 difficulty="medium"):
+        """
+        :param headless: If True, render() does nothing and no visualizer is ever created.
+        :param state_ids: If True, states are returned as integer ids (Discretizer.state_id) instead of tuples.
+        :param state_ranges: Optional per-dimension (min, max) ranges for the Discretizer, e.g. _STATE_RANGES.
+                             Models trained with ranges are not compatible with the default discretization.
+        :param bins_per_dimension: Optional bins per state dimension (defaults to _BINS_PER_DIMENSION);
+                                   agents must be trained and tested with the same bins.
+        :param seed: Seed of the environment's own generator (serves and the scripted AI), see reset().
+        :param difficulty: Level of the scripted opponent of _get_ai_action: "easy", "medium" or "hard".
+        """
         super(MultiplayerPongEnv, self).__init__()
+        self.headless = headless
         self.field_width = 1.0
         self.field_height = 1.0
         self.paddle_height = 0.2
@@ -21,8 +32,8 @@ class MultiplayerPongEnv(gym.Env):
         self.min_speed = 0.04
 
         # Discretization
-        bins_per_dimension = [12, 12, 2, 2, 12, 12]
-        self.discretizer = Discretizer(bins_per_dimension=bins_per_dimension)
+        self.state_ids = state_ids
+        self.discretizer = Discretizer(bins_per_dimension=bins_per_dimension or _BINS_PER_DIMENSION, ranges=state_ranges)
 
         # Actions
         self.action_list = [0, 0.04, -0.04]
@@ -35,21 +46,36 @@ class MultiplayerPongEnv(gym.Env):
         )
         self.action_space = spaces.Discrete(3)
 
-        self.visualizer = Visualizer()
+        self.visualizer = None  # Created by the first render() call
+
+        # Buffers reused by every step: the continuous observation and the (empty) info dict
+        self._observation = np.empty(6, dtype=np.float32)
+        self._info = {}
+
+        # Scripted opponent
+        self.difficulty = difficulty
 
         # Initial state
+        self.rng = np.random.default_rng(seed)
+        self._uniforms = UniformStream(self.rng)  # Draws of the easy AI
         self.reset()
 
-    def reset(self):
+    def reset(self, seed=None):
         """
         Resets the environment to its initial state.
+        :param seed: If given, the environment's generator is re-created from it first, so the
+                     following episodes are reproducible independently of any other generator.
         """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+            self._uniforms = UniformStream(self.rng)
         self.ball_x = self.field_width / 2
         self.ball_y = self.field_height / 2
+        self.previous_ball_y = self.ball_y
 
         # Randomize ball's initial velocity
-        self.velocity_x = random.choice([0.03, -0.03])
-        self.velocity_y = random.uniform(-0.02, 0.02)
+        self.velocity_x = 0.03 if self.rng.random() < 0.5 else -0.03
+        self.velocity_y = self.rng.uniform(-0.02, 0.02)
 
         self.left_paddle_y = (self.field_height - self.paddle_height) / 2
         self.right_paddle_y = (self.field_height - self.paddle_height) / 2
@@ -74,32 +100,35 @@ class MultiplayerPongEnv(gym.Env):
         # Update ball position
         self._update_ball_position()
 
-        # Handle collisions and rewards
-        left_reward, right_reward = 0, 0
+        # Handle collisions and rewards (constant tuples, nothing is allocated)
+        rewards = (0, 0)
         if self.ball_x <= 0:  # Collision with left paddle
             if self.left_paddle_y <= self.ball_y <= self.left_paddle_y + self.paddle_height:
                 self._handle_paddle_collision(self.left_paddle_y)
-                left_reward = 1
+                rewards = (1, 0)
             else:
                 self.done = True
-                left_reward = -1
-                right_reward = 1
+                rewards = (-1, 1)
 
         if self.ball_x >= 1:  # Collision with right paddle
             if self.right_paddle_y <= self.ball_y <= self.right_paddle_y + self.paddle_height:
                 self._handle_paddle_collision(self.right_paddle_y)
-                right_reward = 1
+                rewards = (0, 1)
             else:
                 self.done = True
-                right_reward = -1
-                left_reward = 1
+                rewards = (1, -1)
 
-        return self._get_discretized_state(), (left_reward, right_reward), self.done, {}
+        return self._get_discretized_state(), rewards, self.done, self._info
 
     def render(self):
         """
         Renders the environment.
         """
+        if self.headless:
+            return
+        if self.visualizer is None:
+            from utils.visualizer import Visualizer
+            self.visualizer = Visualizer()
         if self.visualizer:
             self.visualizer.render(
                 ball_pos=(self.ball_x, self.ball_y),
@@ -114,49 +143,52 @@ class MultiplayerPongEnv(gym.Env):
         if self.visualizer:
             self.visualizer.close()
 
-    def _get_ai_action(self):
+    def _get_ai_action(self, side="right"):
         """
         Determines the AI's action based on the selected difficulty level.
+        :param side: Paddle controlled by the AI, "right" or "left".
         """
+        paddle_y = self.right_paddle_y if side == "right" else self.left_paddle_y
         if self.difficulty == "easy":
-            return self._easy_ai()
+            return self._easy_ai(paddle_y)
         elif self.difficulty == "medium":
-            return self._medium_ai()
+            return self._medium_ai(paddle_y)
         elif self.difficulty == "hard":
-            return self._hard_ai()
+            return self._hard_ai(paddle_y)
         else:
             raise ValueError(f"Unknown difficulty level: {self.difficulty}")
 
-    def _easy_ai(self):
+    def _easy_ai(self, paddle_y):
         """
         Moves the paddle randomly or slightly towards the ball.
         """
-        if random.random() < 0.5:
-            return random.choice([1, 2])  # Randomly move up or down
-        elif self.ball_y > self.right_paddle_y + self.paddle_height / 2:
+        u = self._uniforms.next()
+        if u < 0.5:
+            return 1 if u < 0.25 else 2  # Randomly move up or down
+        elif self.ball_y > paddle_y + self.paddle_height / 2:
             return 1  # Move down
-        elif self.ball_y < self.right_paddle_y + self.paddle_height / 2:
+        elif self.ball_y < paddle_y + self.paddle_height / 2:
             return 2  # Move up
         return 0  # Stay
 
-    def _medium_ai(self):
+    def _medium_ai(self, paddle_y):
         """
-        Follows the ball with a slight delay.
+        Follows the ball with a slight delay (the ball position of the previous step).
         """
-        target_position = self.ball_y
-        if target_position > self.right_paddle_y + self.paddle_height / 2:
+        target_position = self.previous_ball_y
+        if target_position > paddle_y + self.paddle_height / 2:
             return 1  # Move down
-        elif target_position < self.right_paddle_y + self.paddle_height / 2:
+        elif target_position < paddle_y + self.paddle_height / 2:
             return 2  # Move up
         return 0  # Stay
 
-    def _hard_ai(self):
+    def _hard_ai(self, paddle_y):
         """
         Tracks the ball perfectly to act as an unbeatable opponent.
         """
-        if self.ball_y > self.right_paddle_y + self.paddle_height / 2:
+        if self.ball_y > paddle_y + self.paddle_height / 2:
             return 1  # Move down
-        elif self.ball_y < self.right_paddle_y + self.paddle_height / 2:
+        elif self.ball_y < paddle_y + self.paddle_height / 2:
             return 2  # Move up
         return 0  # Stay
 
@@ -164,6 +196,7 @@ class MultiplayerPongEnv(gym.Env):
         """
         Updates the ball's position and handles wall collisions.
         """
+        self.previous_ball_y = self.ball_y  # Followed by the medium AI
         self.ball_x += self.velocity_x
         self.ball_y += self.velocity_y
 
@@ -179,7 +212,10 @@ class MultiplayerPongEnv(gym.Env):
 
         paddle_center = paddle_y + self.paddle_height / 2
         impact_factor = (self.ball_y - paddle_center) / (self.paddle_height / 2)
-        impact_factor = np.clip(impact_factor, -1, 1)
+        if impact_factor < -1:
+            impact_factor = -1.0
+        elif impact_factor > 1:
+            impact_factor = 1.0
 
         self.velocity_y += impact_factor * 0.005
 
@@ -189,24 +225,32 @@ class MultiplayerPongEnv(gym.Env):
     def _clamp_paddle_positions(self):
         """
         Keeps the paddles within the bounds of the field.
+        Plain float comparisons give the same values as np.clip without turning the positions into NumPy scalars.
         """
-        self.left_paddle_y = np.clip(self.left_paddle_y, 0, self.field_height - self.paddle_height)
-        self.right_paddle_y = np.clip(self.right_paddle_y, 0, self.field_height - self.paddle_height)
+        high = self.field_height - self.paddle_height
+        self.left_paddle_y = min(max(self.left_paddle_y, 0.0), high)
+        self.right_paddle_y = min(max(self.right_paddle_y, 0.0), high)
 
     def _get_continuous_state(self):
         """
         Returns the continuous state representation.
+        The float32 buffer is reused by every call: copy it if it has to outlive the next step.
         """
-        return np.array([
+        observation = self._observation
+        observation[:] = (
             self.ball_x,
             self.ball_y,
             self.velocity_x,
             self.velocity_y,
             self.left_paddle_y,
             self.right_paddle_y,
-        ], dtype=np.float32)
+        )
+        return observation
 
     def _get_user_action(self):
+        import pygame
+        if not pygame.get_init():
+            pygame.init()
         keys = pygame.key.get_pressed()
 
         if keys[pygame.K_UP]:
@@ -221,4 +265,6 @@ class MultiplayerPongEnv(gym.Env):
         Returns the discretized state representation using the Discretizer.
         """
         continuous_state = self._get_continuous_state()
+        if self.state_ids:
+            return self.discretizer.state_id(continuous_state)
         return self.discretizer.discretize(continuous_state)
\ No newline at end of file
@@ -0,0 +1,143 @@
+from utils.discretizer import Discretizer
+from utils.parameters import _BINS_PER_DIMENSION
+import numpy as np
+
+
+class VectorPongEnv:
+    """
+    Batched version of MultiplayerPongEnv: steps N independent games with one call.
+    The whole physics state lives in NumPy arrays and collisions are handled with masks,
+    with the same per-game arithmetic as MultiplayerPongEnv.
+    """
+    def __init__(self, num_envs, seed=None, state_ids=False, state_ranges=None):
+        """
+        :param num_envs: Number of games simulated in parallel.
+        :param seed: Seed for the random generator used to serve the ball.
+        :param state_ids: If True, states are returned as an array of integer ids instead of (num_envs, 6).
+        :param state_ranges: Optional per-dimension (min, max) ranges for the Discretizer.
+        """
+        self.num_envs = num_envs
+        self.field_width = 1.0
+        self.field_height = 1.0
+        self.paddle_height = 0.2
+        self.ball_radius = 0.02
+
+        self.state_ids = state_ids
+        self.discretizer = Discretizer(bins_per_dimension=_BINS_PER_DIMENSION, ranges=state_ranges)
+        self.action_list = np.array([0, 0.04, -0.04])
+        self.rng = np.random.default_rng(seed)
+
+        self.ball_x = np.empty(num_envs)
+        self.ball_y = np.empty(num_envs)
+        self.velocity_x = np.empty(num_envs)
+        self.velocity_y = np.empty(num_envs)
+        self.left_paddle_y = np.empty(num_envs)
+        self.right_paddle_y = np.empty(num_envs)
+        self.done = np.zeros(num_envs, dtype=bool)
+
+        # Initial state
+        self.reset()
+
+    def reset(self, mask=None, seed=None):
+        """
+        Resets all games, or only the ones selected by a boolean mask.
+        :param mask: Optional boolean array of length num_envs.
+        :param seed: If given, the generator is re-created from it first (as in MultiplayerPongEnv.reset).
+        :return: Array with the discretized states of all games.
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        count = int(np.count_nonzero(mask))
+
+        self.ball_x[mask] = self.field_width / 2
+        self.ball_y[mask] = self.field_height / 2
+
+        # Randomize ball's initial velocity
+        self.velocity_x[mask] = self.rng.choice([0.03, -0.03], size=count)
+        self.velocity_y[mask] = self.rng.uniform(-0.02, 0.02, size=count)
+
+        self.left_paddle_y[mask] = (self.field_height - self.paddle_height) / 2
+        self.right_paddle_y[mask] = (self.field_height - self.paddle_height) / 2
+        self.done[mask] = False
+
+        return self._get_discretized_state()
+
+    def step(self, left_actions, right_actions):
+        """
+        Advances every game by one step. Finished games are reset automatically.
+        :param left_actions: Integer array (num_envs,) with the left paddle actions.
+        :param right_actions: Integer array (num_envs,) with the right paddle actions.
+        :return: Tuple (states, rewards, dones, info). ``rewards`` has shape (num_envs, 2) with
+                 the left and right rewards; ``states`` already holds the reset state for finished
+                 games, whose terminal state is in ``info["final_states"]``.
+        """
+        # Update and clamp paddles
+        self.left_paddle_y += self.action_list[left_actions]
+        self.right_paddle_y += self.action_list[right_actions]
+        np.clip(self.left_paddle_y, 0, self.field_height - self.paddle_height, out=self.left_paddle_y)
+        np.clip(self.right_paddle_y, 0, self.field_height - self.paddle_height, out=self.right_paddle_y)
+
+        # Update ball position and bounce on top and bottom walls
+        self.ball_x += self.velocity_x
+        self.ball_y += self.velocity_y
+        wall = (self.ball_y <= 0) | (self.ball_y >= self.field_height)
+        self.velocity_y[wall] *= -1
+
+        rewards = np.zeros((self.num_envs, 2), dtype=np.int64)
+        self._handle_side(self.ball_x <= 0, self.left_paddle_y, rewards, 0)
+        self._handle_side(self.ball_x >= 1, self.right_paddle_y, rewards, 1)
+
+        dones = self.done.copy()
+        final_states = self._get_discretized_state()
+        states = self.reset(dones) if dones.any() else final_states
+        return states, rewards, dones, {"final_states": final_states}
+
+    def _handle_side(self, reached, paddle_y, rewards, side):
+        """
+        Applies paddle hits and misses for the games where the ball reached one side.
+        :param reached: Boolean mask of the games where the ball crossed this side.
+        :param paddle_y: Paddle positions on this side.
+        :param rewards: Reward array to fill in place.
+        :param side: 0 for the left paddle, 1 for the right paddle.
+        """
+        if not reached.any():
+            return
+        hit = reached & (paddle_y <= self.ball_y) & (self.ball_y <= paddle_y + self.paddle_height)
+        miss = reached & ~hit
+
+        # Paddle collision
+        self.velocity_x[hit] = -self.velocity_x[hit]
+        paddle_center = paddle_y[hit] + self.paddle_height / 2
+        impact_factor = (self.ball_y[hit] - paddle_center) / (self.paddle_height / 2)
+        impact_factor = np.clip(impact_factor, -1, 1)
+        self.velocity_y[hit] += impact_factor * 0.005
+        self.velocity_x[hit] *= 1.02
+        rewards[hit, side] = 1
+
+        # Missed ball: the game ends and the opponent scores
+        self.done[miss] = True
+        rewards[miss, side] = -1
+        rewards[miss, 1 - side] = 1
+
+    def _get_continuous_state(self):
+        """
+        Returns the continuous states as a (num_envs, 6) float32 array.
+        """
+        return np.stack([
+            self.ball_x,
+            self.ball_y,
+            self.velocity_x,
+            self.velocity_y,
+            self.left_paddle_y,
+            self.right_paddle_y,
+        ], axis=1).astype(np.float32)
+
+    def _get_discretized_state(self):
+        """
+        Returns the discretized states as a (num_envs, 6) integer array, or (num_envs,) ids.
+        """
+        if self.state_ids:
+            return self.discretizer.state_ids(self._get_continuous_state())
+        return self.discretizer.discretize_batch(self._get_continuous_state())
@@ -1,8 +1,8 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import os
 from tkinter import messagebox
 from utils.parameters import Q_Parameters, SARSA_Parameters  # Import default parameters
+from gui.model_registry import ModelRegistry
 from main import start_main
 
 # Directory constants for pre-trained models
@@ -13,6 +13,8 @@ def launch_game_config_gui():
     """
     Function to launch the Game Configuration GUI.
     """
+    registry = ModelRegistry(model_dirs={"qlearning": QL_MODELS_DIR, "sarsa": SARSA_MODELS_DIR})  # Indexes models/ once
+
     def get_model_files(agent_type, side):
         """
         Fetch pre-trained model files for the given agent type and side.
@@ -20,10 +22,7 @@ def launch_game_config_gui():
         :param side: The side of the agent ('left' or 'right').
         :return: List of available models for the given agent type and side.
         """
-        directory = QL_MODELS_DIR if agent_type == "qlearning" else SARSA_MODELS_DIR
-        if not os.path.exists(directory):
-            return []
-        return [f for f in os.listdir(directory) if f.endswith(f"_{side}.pkl")]
+        return registry.list_models(agent_type, side)
 
 
     def update_fields():
@@ -95,6 +94,11 @@ def launch_game_config_gui():
             )
             model_dropdown.pack(anchor="w", pady=2)
             model_dropdown.set("")
+            # Start loading the selected model in the background, so starting the match does not wait for it
+            model_dropdown.bind(
+                "<<ComboboxSelected>>",
+                lambda e: registry.preload(agent_type_dropdown.get(), model_dropdown.get())
+            )
 
 
     def validate_and_start():
@@ -157,7 +161,7 @@ def launch_game_config_gui():
         root.destroy()
 
         # Call the main function with the collected configuration
-        start_main(config)
+        start_main(config, registry=registry)
 
     # Initialize the GUI
     root = ttk.Window(themename="superhero")  # Use ttkbootstrap themes
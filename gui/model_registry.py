@@ -0,0 +1,126 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from agents.model_files import AGENT_CLASSES, MODEL_DIRS, scan_models
+from agents.policy_agent import PolicyAgent, is_policy_file
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Index of the saved models with a bounded LRU cache of loaded agents.
+
+    The model directories are scanned once (or on refresh()), so filling the dropdowns never
+    touches the disk. preload() loads a model on a background thread as soon as it is selected;
+    get_agent() then returns the cached agent, or waits for the pending load. Agents are shared
+    between calls, so callers must not train them.
+    """
+    def __init__(self, model_dirs=None, cache_size=4, dense=True):
+        """
+        :param model_dirs: Dict agent type -> directory (defaults to MODEL_DIRS).
+        :param cache_size: Maximum number of loaded agents kept in memory.
+        :param dense: Load the pickled models into dense Q-tables, played on integer state ids.
+        """
+        self.model_dirs = model_dirs or MODEL_DIRS
+        self.dense = dense
+        self.cache_size = cache_size
+
+        self._models = {}  # (agent_type, name) -> metadata dict
+        self._hashes = {}  # (path, size, mtime) -> content hash, kept across refreshes
+        self._cache = OrderedDict()  # (path, size, mtime) -> agent, least recently used first
+        self._pending = {}  # (path, size, mtime) -> Future of a background load
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-preload")
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rescans the model directories.
+        """
+        self._models = {
+            (model["agent_type"], model["name"]): dict(model, algorithm=model["agent_type"])
+            for model in scan_models(self.model_dirs)
+        }
+
+    def list_models(self, agent_type, side):
+        """
+        Returns the names of the models of an agent type for one side, sorted.
+        """
+        return sorted(info["name"] for (model_type, _), info in self._models.items()
+                      if model_type == agent_type and info["side"] == side)
+
+    def info(self, agent_type, name):
+        """
+        Returns the metadata of a model, including its content hash (computed once per file version).
+        """
+        info = self._models[(agent_type, name)]
+        key = self._key(agent_type, name)
+        if key not in self._hashes:
+            self._hashes[key] = file_hash(info["path"])
+        return dict(info, hash=self._hashes[key])
+
+    def preload(self, agent_type, name):
+        """
+        Starts loading a model in the background, unless it is cached or already loading.
+        """
+        key = self._key(agent_type, name)
+        with self._lock:
+            if key in self._cache or key in self._pending:
+                return
+            self._pending[key] = self._executor.submit(self._load, agent_type, key)
+
+    def get_agent(self, agent_type, name):
+        """
+        Returns the loaded agent of a model, from the cache, a pending preload or a synchronous load.
+        """
+        key = self._key(agent_type, name)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            future = self._pending.get(key)
+        if future is not None:
+            return future.result()
+        return self._load(agent_type, key)
+
+    def close(self):
+        """
+        Stops the preloading thread.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _key(self, agent_type, name):
+        # A model saved again under the same name gets a new key, so stale agents are never returned
+        info = self._models[(agent_type, name)]
+        return info["path"], info["size"], info["mtime"]
+
+    def _load(self, agent_type, key):
+        try:
+            if is_policy_file(key[0]):
+                agent = PolicyAgent(key[0])  # Exported greedy policy, the same agent for both algorithms
+            else:
+                agent = AGENT_CLASSES[agent_type](dense=self.dense)
+                agent.load(key[0])
+        except Exception:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        with self._lock:
+            # Cached and no longer pending in one step, so get_agent never misses both
+            self._pending.pop(key, None)
+            self._cache[key] = agent
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return agent
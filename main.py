@@ -1,80 +1,179 @@
 from agents.qlearning_angent import QLearningAgent
 from agents.sarsa_agent import SARSAAgent
+from agents.mirrored_agent import MirroredAgent
+from agents.policy_agent import POLICY_EXTENSION, PolicyAgent, export_policy, is_policy_file
 from environments.pong_environment import MultiplayerPongEnv
 from training.train_double import train_double_agent
+from training.curriculum import train_curriculum
+from training.train_parallel import train_parallel
+from training.profiler import TrainingProfiler
 from training.test_double import test_double_agent
-from utils.plotter import plot_metrics
-import pygame
-
-def start_main(config):
-    # Initialize environment
-    pygame.init()  # Inizializza Pygame una sola volta
-    env = MultiplayerPongEnv()
+from utils.plotter import plot_metrics, plot_metrics_file
+from utils.metrics import MetricsSink
+import numpy as np
+
+def start_main(config, registry=None):
+    headless = config.get("headless", False)
+    plots = config.get("plots", not headless)  # Headless runs skip the Matplotlib plots unless asked for
+    # With config["seed"] the environment and both agents get independent, reproducible streams
+    seeds = np.random.SeedSequence(config["seed"]).spawn(3) if config.get("seed") is not None else [None] * 3
     user_mode = config["mode"] == "agent_vs_player"  # True if user is playing against agent
+    symmetric = config.get("symmetric", False)  # One Q-table plays both paddles through mirrored states
+    dense = config.get("dense", True)  # NumPy Q-tables, fed integer state ids by the environment
+    left_params = dict(config.get("left_agent_params", {}), dense=dense)
+    right_params = dict(config.get("right_agent_params", {}), dense=dense)
     print(f"config: {config}")
     print(f"User Mode: {user_mode}")
 
     # Initialize left agent
     if config["train_new"]:
-        left_agent = QLearningAgent(**config["left_agent_params"]) if config["left_agent_type"] == "qlearning" else SARSAAgent(**config["left_agent_params"])
+        left_agent = QLearningAgent(**left_params) if config["left_agent_type"] == "qlearning" else SARSAAgent(**left_params)
     else:
-        left_agent = QLearningAgent() if config["left_agent_type"] == "qlearning" else SARSAAgent()
-        left_agent.load(f"models/{config['left_agent_type']}_models/{config['left_model']}")  # Load pre-trained left model
+        if registry:
+            left_agent = registry.get_agent(config["left_agent_type"], config["left_model"])  # Preloaded by the GUI
+        else:
+            left_path = f"models/{config['left_agent_type']}_models/{config['left_model']}"
+            if is_policy_file(left_path):
+                left_agent = PolicyAgent(left_path)  # Exported greedy policy
+            else:
+                left_agent = QLearningAgent(dense=dense) if config["left_agent_type"] == "qlearning" else SARSAAgent(dense=dense)
+                left_agent.load(left_path)  # Load pre-trained left model
 
     # Initialize right agent if in agent-vs-agent mode
-    if config["mode"] == "agent_vs_agent":
+    if config["mode"] == "agent_vs_agent" and symmetric:
+        right_agent = MirroredAgent(left_agent)  # The left model also plays the right paddle
+    elif config["mode"] == "agent_vs_agent":
         if config["train_new"]:
-            right_agent = QLearningAgent(**config["right_agent_params"]) if config["right_agent_type"] == "qlearning" else SARSAAgent(**config["right_agent_params"])
+            right_agent = QLearningAgent(**right_params) if config["right_agent_type"] == "qlearning" else SARSAAgent(**right_params)
         else:
-            right_agent = QLearningAgent() if config["right_agent_type"] == "qlearning" else SARSAAgent()
-            right_agent.load(f"models/{config['right_agent_type']}_models/{config['right_model']}")  # Load pre-trained right model
+            if registry:
+                right_agent = registry.get_agent(config["right_agent_type"], config["right_model"])  # Preloaded by the GUI
+            else:
+                right_path = f"models/{config['right_agent_type']}_models/{config['right_model']}"
+                if is_policy_file(right_path):
+                    right_agent = PolicyAgent(right_path)  # Exported greedy policy
+                else:
+                    right_agent = QLearningAgent(dense=dense) if config["right_agent_type"] == "qlearning" else SARSAAgent(dense=dense)
+                    right_agent.load(right_path)  # Load pre-trained right model
     else:
         right_agent = None  # Player-controlled opponent
 
+    # Initialize environment with the bins the (loaded) models were trained on
+    # (headless runs never import pygame, the visualizer is created on the first render)
+    bins_per_dimension = list(left_agent.bins_per_dimension)
+    if right_agent is not None and list(right_agent.bins_per_dimension) != bins_per_dimension:
+        raise ValueError(
+            f"The models use different discretizations: left {bins_per_dimension}, right {list(right_agent.bins_per_dimension)}"
+        )
+    # Dense tables are indexed directly by the integer ids of Discretizer.state_id (dictionary tables keep tuples)
+    state_ids = left_agent.dense and (right_agent is None or right_agent.dense)
+    env = MultiplayerPongEnv(headless=headless, state_ids=state_ids, bins_per_dimension=bins_per_dimension, seed=seeds[0])
+
     if config["train_new"]:
         # Train agents
         #if agent_vs_player is selected the right agent is the clone of the left agent for the training
-        if config["mode"] == "agent_vs_player":
-            right_agent = QLearningAgent(**config["left_agent_params"]) if config["left_agent_type"] == "qlearning" else SARSAAgent(**config["left_agent_params"])
-
-        left_rewards, right_rewards = train_double_agent(
-            env,
-            left_agent,
-            right_agent,
-            episodes=config["episodes"],
-            log_interval=1000,
-            plot_path="results/training_rewards.png",
-            user_mode=user_mode,
-        )
+        if symmetric:
+            right_agent = MirroredAgent(left_agent)  # Learns into the left agent's table from the right paddle's transitions
+        elif config["mode"] == "agent_vs_player":
+            right_agent = QLearningAgent(**left_params) if config["left_agent_type"] == "qlearning" else SARSAAgent(**left_params)
+        left_agent.set_seed(seeds[1])
+        right_agent.set_seed(seeds[2])
+
+        if config.get("num_workers", 1) > 1 and not symmetric:
+            # Parallel self-play training, Q-tables are merged every merge_interval episodes
+            left_rewards, right_rewards = train_parallel(
+                left_agent,
+                right_agent,
+                episodes=config["episodes"],
+                num_workers=config["num_workers"],
+                merge_interval=config.get("merge_interval", 1000),
+                log_interval=1000,
+                seed=config.get("seed"),
+            )
+        else:
+            curriculum = config.get("curriculum") and not user_mode
+            if curriculum and (config.get("checkpoint_dir") or config.get("resume")):
+                # A checkpoint of the self-play phase cannot restore the scripted stages before it
+                raise ValueError("Checkpoints are not supported with curriculum training: remove checkpoint_dir/resume or curriculum.")
+            # Per-phase timings every 1000 episodes and a flame-graph trace in config["profile_path"]
+            profiler = TrainingProfiler(config["profile_path"]) if config.get("profile_path") else None
+            # With a metrics_path the rewards are streamed to disk instead of being kept in memory
+            metrics = MetricsSink(config["metrics_path"], resume=config.get("resume", False)) if config.get("metrics_path") else None
+            if curriculum:
+                # Scripted opponents from easy to hard first, then self-play
+                left_rewards, right_rewards = train_curriculum(
+                    env,
+                    left_agent,
+                    right_agent,
+                    episodes=config["episodes"],
+                    log_interval=1000,
+                    metrics=metrics,
+                    keep_history=metrics is None,
+                    profiler=profiler,
+                )
+            else:
+                left_rewards, right_rewards = train_double_agent(
+                    env,
+                    left_agent,
+                    right_agent,
+                    episodes=config["episodes"],
+                    log_interval=1000,
+                    plot_path="results/training_rewards.png",
+                    user_mode=user_mode,
+                    checkpoint_dir=config.get("checkpoint_dir"),
+                    resume=config.get("resume", False),
+                    metrics=metrics,
+                    keep_history=metrics is None,
+                    profiler=profiler,
+                )
 
         # Save Q-tables after training
         left_model_path = f"models/{config['left_agent_type']}_models/{config['left_agent_type']}_{config["episodes"]}_left.pkl"
         left_agent.save(left_model_path)
 
-        if right_agent:
+        if symmetric:
+            right_model_path = f"{left_model_path} (mirrored)"  # Same table, nothing else to save
+        elif right_agent:
             right_model_path = f"models/{config['right_agent_type']}_models/{config['right_agent_type']}_{config["episodes"]}_right.pkl"
             right_agent.save(right_model_path)
 
         print(f"Models saved:\n  Left Agent: {left_model_path}\n  Right Agent: {right_model_path if right_agent else 'None'}")
 
+        if config.get("export_policy"):
+            # Greedy lookup tables next to the models, playable by PolicyAgent
+            export_policy(left_agent, left_model_path[:-len(".pkl")] + POLICY_EXTENSION)
+            if right_agent and not symmetric:
+                export_policy(right_agent, right_model_path[:-len(".pkl")] + POLICY_EXTENSION)
+
 
         save_path = f"results/{config['left_agent_type']}_vs_{config['right_agent_type']}_training_rewards_{config['episodes']}.png"
         # Plot training results
-        plot_metrics(
-            metrics_dict={"Left Rewards": left_rewards, "Right Rewards": right_rewards},
-            rolling_window=100,
-            title="Training Rewards",
-            xlabel="Episodes",
-            ylabel="Rewards",
-            save_path=save_path,
-        )
+        if plots and config.get("metrics_path") and (config.get("num_workers", 1) <= 1 or symmetric):
+            plot_metrics_file(
+                config["metrics_path"],
+                rolling_window=100,
+                title="Training Rewards",
+                xlabel="Episodes",
+                ylabel="Rewards",
+                save_path=save_path,
+            )
+        elif plots:
+            plot_metrics(
+                metrics_dict={"Left Rewards": left_rewards, "Right Rewards": right_rewards},
+                rolling_window=100,
+                title="Training Rewards",
+                xlabel="Episodes",
+                ylabel="Rewards",
+                save_path=save_path,
+            )
 
         test_double_agent(
             env,
             left_agent,
             right_agent,
             episodes=100,
-            render=True,
+            render=not headless,
+            async_render=config.get("async_render", False),  # Full-speed evaluation, rendered live from another thread
             log_interval=10,
             plot_path="results/testing_rewards.png",
             user_mode=config["mode"] == "user_vs_agent",
@@ -86,26 +185,30 @@ def start_main(config):
             left_agent,
             right_agent,
             episodes=100,
-            render=True,
+            render=not headless,
+            async_render=config.get("async_render", False),  # Full-speed evaluation, rendered live from another thread
             log_interval=10,
             plot_path="results/testing_rewards.png",
             user_mode=user_mode,
         )
 
         # Plot testing results
-        plot_metrics(
-            metrics_dict={"Left Rewards": left_rewards, "Right Rewards": right_rewards},
-            rolling_window=10,
-            title="Testing Rewards",
-            xlabel="Episodes",
-            ylabel="Rewards",
-            save_path="results/double_agent_testing_rewards.png",
-        )
+        if plots:
+            plot_metrics(
+                metrics_dict={"Left Rewards": left_rewards, "Right Rewards": right_rewards},
+                rolling_window=10,
+                title="Testing Rewards",
+                xlabel="Episodes",
+                ylabel="Rewards",
+                save_path="results/double_agent_testing_rewards.png",
+            )
 
     # Close environment
     env.close()
     # Close Pygame
-    pygame.quit()
+    if not headless:
+        import pygame
+        pygame.quit()
 
 
 
@@ -0,0 +1,136 @@
+"""
+Socket client of the inference server, and a load test that plays many sessions at once.
+
+Each simulated session runs its own headless MultiplayerPongEnv: the served model plays one
+paddle and the scripted AI of the environment stands in for the human player on the other. Every
+session has its own connection, and the round-trip latency of every request is measured on the
+client side.
+
+Usage:
+    python -m serving.inference_server models/qlearning_models/qlearning_500000_right.qbin &
+    python -m serving.client qlearning_500000_right.qbin --sessions 64 --steps 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from environments.pong_environment import MultiplayerPongEnv
+from serving.inference_server import LatencyStats
+
+
+class InferenceClient:
+    """
+    One connection to the inference server. Requests can be pipelined: answers are matched to
+    the pending requests by id.
+    """
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._pending = {}  # request id -> Future
+        self._stats = None  # Future of a stats request
+        self._next_id = 0
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def get_action(self, model, state):
+        """
+        Asks the server for the greedy action of a model.
+        :param model: File name of a served model.
+        :param state: Continuous observation (sequence of 6 numbers).
+        :return: Action.
+        """
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(json.dumps({"id": request_id, "model": model, "state": [float(x) for x in state]}).encode() + b"\n")
+        return await future
+
+    async def stats(self):
+        """
+        :return: Latency statistics measured by the server.
+        """
+        self._stats = asyncio.get_running_loop().create_future()
+        self._writer.write(b'{"op": "stats"}\n')
+        return await self._stats
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._reader_task.cancel()
+
+    async def _read_loop(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if "id" not in message:
+                self._stats.set_result(message)
+            elif "error" in message:
+                self._pending.pop(message["id"]).set_exception(RuntimeError(message["error"]))
+            else:
+                self._pending.pop(message["id"]).set_result(message["action"])
+        for future in self._pending.values():
+            future.set_exception(ConnectionError("connection closed by the server"))
+
+
+async def play_session(host, port, model, side, steps, latency, seed=None):
+    """
+    Plays ``steps`` steps of a session against the server, recording the round-trip latencies.
+    :param side: Side of the served model, "left" or "right".
+    """
+    client = await InferenceClient.connect(host, port)
+    env = MultiplayerPongEnv(headless=True, seed=seed)
+    env.reset()
+    player_side = "left" if side == "right" else "right"
+    for _ in range(steps):
+        sent = time.perf_counter()
+        action = await client.get_action(model, env._get_continuous_state())
+        latency.record(time.perf_counter() - sent)
+        player_action = env._get_ai_action(player_side)
+        _, _, done, _ = env.step((action, player_action) if side == "left" else (player_action, action))
+        if done:
+            env.reset()
+    await client.close()
+
+
+async def run_load_test(model, sessions=16, steps=500, host="127.0.0.1", port=8765, side=None):
+    """
+    Plays ``sessions`` concurrent sessions and returns the client-side and server-side latencies.
+    :param side: Side of the model (by default from its name, "_left" or "_right").
+    """
+    side = side or ("left" if "_left" in model else "right")
+    latency = LatencyStats()
+    started = time.perf_counter()
+    await asyncio.gather(*(play_session(host, port, model, side, steps, latency, seed) for seed in range(sessions)))
+    elapsed = time.perf_counter() - started
+
+    client = await InferenceClient.connect(host, port)
+    server_stats = await client.stats()
+    await client.close()
+    return {
+        "client": dict(latency.summary(), requests_per_second=round(latency.count / elapsed, 1)),
+        "server": server_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the inference server with simulated player sessions.")
+    parser.add_argument("model", help="File name of a served model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=500, help="Requests per session")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.model, args.sessions, args.steps, args.host, args.port))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
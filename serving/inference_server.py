@@ -0,0 +1,238 @@
+"""
+Asyncio inference server for agent-vs-player sessions.
+
+Each model is loaded once, as a read-only dense Q-table: ``.qbin`` models are memory-mapped with
+mode "r", so several server processes share the same pages. Many player sessions connect over
+TCP and send one request per frame; the requests that arrive together are answered in a
+micro-batch, with one discretization and one argmax per model for the whole batch.
+
+Protocol: one JSON object per line, in both directions.
+    {"id": 7, "model": "qlearning_500000_right.qbin", "state": [6 floats]}  ->  {"id": 7, "action": 1}
+    {"op": "stats"}                                                        ->  {"requests": ..., "p50_ms": ...}
+``state`` is the continuous observation of MultiplayerPongEnv (ball x/y, velocity x/y, paddles).
+
+Usage: python -m serving.inference_server models/qlearning_models/qlearning_500000_right.qbin --port 8765
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+import traceback
+import numpy as np
+from agents.base_agent import BaseAgent
+from agents.model_format import is_binary_model, load_binary
+from utils.discretizer import Discretizer
+from utils.parameters import _ACTIONS
+
+
+def load_served_model(path):
+    """
+    Loads a model as a read-only dense agent.
+    :param path: ``.qbin`` (memory-mapped, mode "r") or pickled model.
+    """
+    agent = BaseAgent(actions=_ACTIONS, dense=True)
+    if is_binary_model(path):
+        load_binary(agent, path, mode="r")
+        return agent
+    agent.load(path)  # Same dense fill as every other loader
+    agent.q_table.values.flags.writeable = False
+    return agent
+
+
+def valid_state(state, dimensions):
+    """
+    Checks that a request state is a list of ``dimensions`` finite real numbers (no bool, null or NaN).
+    """
+    return (
+        isinstance(state, list) and len(state) == dimensions
+        and all(type(value) in (int, float) and math.isfinite(value) for value in state)
+    )
+
+
+class LatencyStats:
+    """
+    Latencies of the last ``capacity`` requests in a fixed ring buffer, with their percentiles.
+    """
+    def __init__(self, capacity=100000):
+        self.samples = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    def summary(self):
+        """
+        :return: Dict with the number of requests and the p50, p99 and maximum latency in milliseconds.
+        """
+        samples = self.samples[:min(self.count, len(self.samples))]
+        if not len(samples):
+            return {"requests": 0, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        p50, p99 = np.percentile(samples, [50, 99]) * 1000
+        return {
+            "requests": self.count,
+            "p50_ms": round(float(p50), 4),
+            "p99_ms": round(float(p99), 4),
+            "max_ms": round(float(samples.max()) * 1000, 4),
+        }
+
+
+class InferenceServer:
+    """
+    Serves the greedy actions of a set of models to any number of socket clients.
+
+    Every connection is read by its own task, which only parses the lines and queues them. A
+    single batching task takes everything queued (at most ``max_batch`` requests), waiting
+    ``max_wait`` seconds after the first one so that concurrent sessions can join the batch, and
+    writes the answers. The latency of a request runs from the moment its line is read to the
+    moment its answer is written.
+    """
+    def __init__(self, model_paths, host="127.0.0.1", port=8765, max_batch=256, max_wait=0.0):
+        """
+        :param model_paths: Paths of the models to serve; clients address them by file name.
+        :param max_batch: Maximum number of requests answered in one batch.
+        :param max_wait: Seconds the batch waits for more requests after the first one (0 only
+                         collects what arrived in the same event-loop iteration).
+        """
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.models = {}  # file name -> (agent, discretizer)
+        for path in model_paths:
+            agent = load_served_model(path)
+            self.models[os.path.basename(path)] = (agent, Discretizer(agent.bins_per_dimension))
+
+        self.latency = LatencyStats()
+        self.batches = 0
+        self._queue = None
+        self._server = None
+        self._batcher = None
+
+    async def start(self):
+        """
+        Opens the listening socket and starts the batching task.
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # Actual port when started with port 0
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+
+    def stats(self):
+        """
+        :return: Dict with the latency percentiles, the number of batches and the mean batch size.
+        """
+        summary = self.latency.summary()
+        summary["batches"] = self.batches
+        summary["mean_batch_size"] = round(self.latency.count / self.batches, 2) if self.batches else None
+        return summary
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                received = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    self._reply(writer, {"error": "invalid JSON"})
+                    continue
+                if not isinstance(request, dict):
+                    self._reply(writer, {"error": "expected a JSON object"})
+                elif request.get("op") == "stats":
+                    self._reply(writer, self.stats())
+                elif not isinstance(request.get("model"), str) or request["model"] not in self.models:
+                    self._reply(writer, {"id": request.get("id"), "error": f"unknown model: {request.get('model')}"})
+                elif type(request.get("id")) is not int:
+                    self._reply(writer, {"id": request.get("id"), "error": "expected an integer id"})
+                elif not valid_state(request.get("state"), len(self.models[request["model"]][1].bins_per_dimension)):
+                    self._reply(writer, {"id": request["id"], "error": "invalid state"})
+                else:
+                    self._queue.put_nowait((request["model"], request["state"], request.get("id"), writer, received))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self.max_wait)  # Lets the other connections queue their requests
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                self._answer(batch)
+            except Exception:
+                # One bad batch must not stop the answers to every session
+                traceback.print_exc()
+
+    def _answer(self, batch):
+        by_model = {}
+        for request in batch:
+            by_model.setdefault(request[0], []).append(request)
+
+        for name, requests in by_model.items():
+            agent, discretizer = self.models[name]
+            try:
+                with np.errstate(over="ignore"):
+                    states = np.array([request[1] for request in requests], dtype=np.float32)
+                if not np.isfinite(states).all():  # Values beyond the float32 range overflow to inf
+                    raise ValueError("non-finite state")
+                actions = agent.get_best_actions(discretizer.state_ids(states)).tolist()
+            except (TypeError, ValueError):
+                # A malformed state fails the whole group: answer it request by request
+                if len(requests) > 1:
+                    for request in requests:
+                        self._answer([request])
+                    continue
+                self._reply(requests[0][3], {"id": requests[0][2], "error": "invalid state"})
+                continue
+            for (_, _, request_id, writer, received), action in zip(requests, actions):
+                if not writer.is_closing():
+                    writer.write(b'{"id": %d, "action": %d}\n' % (request_id, action))
+                self.latency.record(time.perf_counter() - received)
+        self.batches += 1
+
+    @staticmethod
+    def _reply(writer, message):
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the greedy actions of saved models over TCP.")
+    parser.add_argument("models", nargs="+", help="Model files (.qbin or .pkl)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=0.0, help="Wait after the first request of a batch")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between latency reports")
+    args = parser.parse_args()
+
+    server = InferenceServer(args.models, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+
+    async def run():
+        await server.start()
+        print(f"Serving {', '.join(server.models)} on {server.host}:{server.port}")
+        while True:
+            await asyncio.sleep(args.report_interval)
+            print(server.stats())
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(server.stats())
+
+
+if __name__ == "__main__":
+    main()
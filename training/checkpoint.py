@@ -0,0 +1,97 @@
+import os
+import pickle
+import queue
+import random
+import threading
+import numpy as np
+
+CHECKPOINT_FILE = "checkpoint.pkl"
+
+
+class CheckpointWriter:
+    """
+    Writes training checkpoints from a background thread.
+
+    The agents are serialized in the caller's thread, so the snapshot is consistent with the
+    episode it belongs to; only the disk I/O runs in the background. Every file is written to a
+    temporary path and moved into place with os.replace, so a crash never leaves a truncated
+    checkpoint behind.
+    """
+    def __init__(self, directory):
+        """
+        :param directory: Directory holding the checkpoint file (created if missing).
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, CHECKPOINT_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=1)  # At most one pending write: a slow disk throttles, not piles up
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, episode, agent_left, agent_right, left_rewards, right_rewards, env=None):
+        """
+        Snapshots both agents (with their generators) and the RNG states and schedules the write.
+        :param episode: Number of completed episodes.
+        :param env: Environment whose generator state is saved too.
+        """
+        if self._error is not None:
+            raise self._error
+        payload = pickle.dumps({
+            "episode": episode,
+            "agent_left": agent_left,
+            "agent_right": agent_right,
+            "left_rewards": left_rewards,
+            "right_rewards": right_rewards,
+            "random_state": random.getstate(),
+            "numpy_random_state": np.random.get_state(),
+            "env_rng_state": env.rng.bit_generator.state if env is not None else None,
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        self._queue.put(payload)
+
+    def close(self):
+        """
+        Waits for the pending write and stops the background thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            if payload is None:
+                return
+            try:
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except OSError as error:
+                self._error = error
+
+
+def load_checkpoint(directory, agent_left, agent_right, env=None):
+    """
+    Restores the agents (in place) and the RNG states from the last checkpoint in a directory.
+    :param env: Environment whose generator is restored, if its state was saved.
+    :return: Tuple (completed episodes, left_rewards, right_rewards), or None if there is no checkpoint.
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+
+    agent_left.__dict__.update(data["agent_left"].__dict__)
+    agent_right.__dict__.update(data["agent_right"].__dict__)
+    random.setstate(data["random_state"])
+    np.random.set_state(data["numpy_random_state"])
+    if env is not None and data.get("env_rng_state") is not None:
+        env.rng.bit_generator.state = data["env_rng_state"]
+    print(f"Resumed from {path} at episode {data['episode']}")
+    return data["episode"], data["left_rewards"], data["right_rewards"]
@@ -0,0 +1,286 @@
+"""
+Compiled training backend: one fused kernel simulates whole episodes of MultiplayerPongEnv
+physics and applies the Q-learning / SARSA updates of both agents to their dense Q arrays.
+
+The kernel is compiled with numba when it is installed; train_double_agent(backend="numba")
+falls back to the regular Python loop otherwise. The arithmetic follows MultiplayerPongEnv.step,
+Discretizer (float32 product) and the agents' observe methods; only the random streams differ
+(the kernel's generator is seeded from the environment's and agents' generators).
+"""
+import math
+import warnings
+import numpy as np
+from agents.qlearning_angent import QLearningAgent
+from agents.sarsa_agent import SARSAAgent
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+_QLEARNING = 0
+_SARSA = 1
+
+# Columns of the hyperparameter rows passed to the kernel
+_EPS_START, _EPS_END, _EPS_DECAY, _ALPHA_END, _ALPHA_DECAY, _GAMMA = range(6)
+
+
+def _jit(function):
+    return numba.njit(cache=True)(function) if NUMBA_AVAILABLE else function
+
+
+@_jit
+def _seed(seed):
+    np.random.seed(seed)  # Inside a compiled function this seeds numba's own generator
+
+
+@_jit
+def _argmax(q_values, row):
+    best = 0
+    for action in range(1, q_values.shape[1]):
+        if q_values[row, action] > q_values[row, best]:
+            best = action
+    return best
+
+
+@_jit
+def _epsilon_greedy(q_values, row, hyper, steps_done):
+    eps_threshold = hyper[_EPS_END] + (hyper[_EPS_START] - hyper[_EPS_END]) * math.exp(-1.0 * steps_done / hyper[_EPS_DECAY])
+    if np.random.random() < eps_threshold:
+        return np.random.randint(0, q_values.shape[1])
+    return _argmax(q_values, row)
+
+
+@_jit
+def _state_row(state, bins, radix):
+    row = 0
+    for i in range(state.shape[0]):
+        value = math.floor(np.float32(state[i]) * np.float32(bins[i])) + 1
+        if value < 0:
+            value = 0
+        elif value >= radix[i]:
+            value = radix[i] - 1
+        row = row * radix[i] + value
+    return row
+
+
+@_jit
+def _td_update(q_values, visits, row, action, reward, next_q, alpha, hyper):
+    visits[row, action] += 1
+    adjusted_alpha = max(hyper[_ALPHA_END], alpha / (1 + visits[row, action]))
+    old_q = np.float64(q_values[row, action])
+    q_values[row, action] = old_q + adjusted_alpha * (reward + hyper[_GAMMA] * next_q - old_q)
+
+
+@_jit
+def _observe(algorithm, q_values, visits, row, action, reward, next_row, hyper, alphas, steps, side):
+    if algorithm == _QLEARNING:
+        next_q = np.float64(q_values[next_row, _argmax(q_values, next_row)])
+    else:
+        next_action = _epsilon_greedy(q_values, next_row, hyper, steps[side])
+        steps[side] += 1
+        next_q = np.float64(q_values[next_row, next_action])
+    _td_update(q_values, visits, row, action, reward, next_q, alphas[side], hyper)
+    alphas[side] = max(hyper[_ALPHA_END], alphas[side] * hyper[_ALPHA_DECAY])
+
+
+@_jit
+def simulate_episodes(episodes, q_left, visits_left, q_right, visits_right, algorithms, hyper, alphas, steps,
+                      action_list, bins, radix, paddle_height, field_height, rewards_out, rally_out, winners_out):
+    """
+    Plays ``episodes`` self-play episodes, updating both Q arrays, alphas and step counters in place.
+    Per-episode total rewards go to rewards_out (episodes x 2), episode lengths to rally_out and
+    the winning side (0 left, 1 right) to winners_out.
+    """
+    state = np.empty(6)
+    high = field_height - paddle_height
+    for episode in range(episodes):
+        # Reset
+        ball_x = 0.5  # Field width is 1.0 as in MultiplayerPongEnv
+        ball_y = field_height / 2
+        velocity_x = 0.03 if np.random.random() < 0.5 else -0.03
+        velocity_y = np.random.uniform(-0.02, 0.02)
+        left_paddle_y = (field_height - paddle_height) / 2
+        right_paddle_y = (field_height - paddle_height) / 2
+        state[0], state[1], state[2], state[3], state[4], state[5] = ball_x, ball_y, velocity_x, velocity_y, left_paddle_y, right_paddle_y
+        row = _state_row(state, bins, radix)
+
+        left_total = 0.0
+        right_total = 0.0
+        rally = 0
+        done = False
+        while not done:
+            left_action = _epsilon_greedy(q_left, row, hyper[0], steps[0])
+            steps[0] += 1
+            right_action = _epsilon_greedy(q_right, row, hyper[1], steps[1])
+            steps[1] += 1
+
+            # Paddles
+            left_paddle_y = min(max(left_paddle_y + action_list[left_action], 0.0), high)
+            right_paddle_y = min(max(right_paddle_y + action_list[right_action], 0.0), high)
+
+            # Ball and walls
+            ball_x += velocity_x
+            ball_y += velocity_y
+            if ball_y <= 0 or ball_y >= field_height:
+                velocity_y *= -1
+
+            # Paddle collisions and rewards
+            left_reward = 0
+            right_reward = 0
+            for side in range(2):
+                paddle_y = left_paddle_y if side == 0 else right_paddle_y
+                reached = ball_x <= 0 if side == 0 else ball_x >= 1
+                if not reached:
+                    continue
+                if paddle_y <= ball_y <= paddle_y + paddle_height:
+                    velocity_x = -velocity_x
+                    paddle_center = paddle_y + paddle_height / 2
+                    impact_factor = (ball_y - paddle_center) / (paddle_height / 2)
+                    impact_factor = min(max(impact_factor, -1.0), 1.0)
+                    velocity_y += impact_factor * 0.005
+                    velocity_x *= 1.02
+                    if side == 0:
+                        left_reward = 1
+                    else:
+                        right_reward = 1
+                else:
+                    done = True
+                    left_reward = -1 if side == 0 else 1
+                    right_reward = 1 if side == 0 else -1
+
+            state[0], state[1], state[2], state[3], state[4], state[5] = ball_x, ball_y, velocity_x, velocity_y, left_paddle_y, right_paddle_y
+            next_row = _state_row(state, bins, radix)
+
+            _observe(algorithms[0], q_left, visits_left, row, left_action, left_reward, next_row, hyper[0], alphas, steps, 0)
+            _observe(algorithms[1], q_right, visits_right, row, right_action, right_reward, next_row, hyper[1], alphas, steps, 1)
+
+            left_total += left_reward
+            right_total += right_reward
+            rally += 1
+            row = next_row
+
+        rewards_out[episode, 0] = left_total
+        rewards_out[episode, 1] = right_total
+        rally_out[episode] = rally
+        winners_out[episode] = 0 if left_reward > right_reward else 1
+
+
+def _algorithm(agent):
+    if type(agent) is QLearningAgent and agent.replay is None:
+        return _QLEARNING
+    if type(agent) is SARSAAgent:
+        return _SARSA
+    return None
+
+
+def compiled_backend_available(agent_left, agent_right, user_mode=False, env=None, profiler=None):
+    """
+    Checks whether the compiled backend can train these agents, warning about the reason if not.
+    It needs numba, dense plain QLearningAgent/SARSAAgent agents (no replay) and self-play. The
+    kernel discretizes as the Discretizer without ranges, on the bins of the agents, so the
+    environment must use no state_ranges and the same bins as both agents; and a profiler can only
+    time the Python loop.
+    :param env: Environment of the run, checked when given.
+    :param profiler: TrainingProfiler of the run, if any.
+    """
+    if not NUMBA_AVAILABLE:
+        warnings.warn("numba is not installed, using the pure Python training loop.")
+        return False
+    if user_mode or not (agent_left.dense and agent_right.dense):
+        warnings.warn("The compiled backend needs two dense agents in self-play, using the pure Python training loop.")
+        return False
+    if _algorithm(agent_left) is None or _algorithm(agent_right) is None:
+        warnings.warn("The compiled backend supports plain QLearningAgent/SARSAAgent only, using the pure Python training loop.")
+        return False
+    if list(agent_left.bins_per_dimension) != list(agent_right.bins_per_dimension):
+        warnings.warn("The compiled backend needs two agents with the same bins per dimension, using the pure Python training loop.")
+        return False
+    if env is not None and env.discretizer.ranges is not None:
+        warnings.warn("The compiled backend does not support state_ranges, using the pure Python training loop.")
+        return False
+    if env is not None and list(env.discretizer.bins_per_dimension) != list(agent_left.bins_per_dimension):
+        warnings.warn("The compiled backend needs the environment to use the agents' bins per dimension, using the pure Python training loop.")
+        return False
+    if profiler is not None:
+        warnings.warn("The profiler times the Python training loop only, using the pure Python training loop.")
+        return False
+    return True
+
+
+def run_compiled_episodes(env, agent_left, agent_right, episodes):
+    """
+    Runs a chunk of episodes in the fused kernel and writes the learned state back to the agents.
+    :return: Tuple (rewards array (episodes x 2), rally lengths array, winners array: 0 left, 1 right).
+    """
+    agents = (agent_left, agent_right)
+    hyper = np.array([
+        [a.epsilon_start, a.epsilon_end, a.epsilon_decay, a.alpha_end, a.alpha_decay, a.gamma] for a in agents
+    ], dtype=np.float64)
+    alphas = np.array([a.alpha for a in agents], dtype=np.float64)
+    steps = np.array([a.steps_done for a in agents], dtype=np.int64)
+    rewards = np.zeros((episodes, 2))
+    rally = np.zeros(episodes, dtype=np.int64)
+    winners = np.zeros(episodes, dtype=np.int64)
+    radix = np.array(agent_left.q_table.shape[:-1], dtype=np.int64)
+
+    # Derived from the environment's and agents' generators, so seeding them fixes the run
+    seed_sequence = np.random.SeedSequence([int(source.rng.integers(2 ** 32)) for source in (env, agent_left, agent_right)])
+    _seed(int(seed_sequence.generate_state(1)[0]))
+    simulate_episodes(
+        episodes,
+        agent_left.q_table.values, agent_left.visit_count.values,
+        agent_right.q_table.values, agent_right.visit_count.values,
+        np.array([_algorithm(a) for a in agents], dtype=np.int64), hyper, alphas, steps,
+        np.asarray(env.action_list, dtype=np.float64), np.asarray(agent_left.bins_per_dimension, dtype=np.int64), radix,
+        float(env.paddle_height), float(env.field_height), rewards, rally, winners,
+    )
+
+    for agent, alpha, steps_done in zip(agents, alphas, steps):
+        agent.alpha = float(alpha)
+        agent.steps_done = int(steps_done)
+    return rewards, rally, winners
+
+
+def train_compiled(env, agent_left, agent_right, episodes, log_interval, start_episode=0, left_rewards=None,
+                   right_rewards=None, checkpoint_writer=None, checkpoint_interval=10000, metrics=None, keep_history=True):
+    """
+    Training loop of train_double_agent for the compiled backend: the kernel runs chunks of episodes
+    up to the next log or checkpoint boundary, and the bookkeeping happens in Python between chunks.
+    """
+    left_rewards = [] if left_rewards is None else left_rewards
+    right_rewards = [] if right_rewards is None else right_rewards
+
+    episode = start_episode
+    while episode < episodes:
+        boundary = (episode // log_interval + 1) * log_interval
+        if checkpoint_writer:
+            boundary = min(boundary, (episode // checkpoint_interval + 1) * checkpoint_interval)
+        chunk = min(boundary, episodes) - episode
+
+        rewards, rally, winners = run_compiled_episodes(env, agent_left, agent_right, chunk)
+        episode += chunk
+
+        if keep_history:
+            left_rewards.extend(rewards[:, 0].astype(int).tolist())
+            right_rewards.extend(rewards[:, 1].astype(int).tolist())
+        if metrics:
+            for (left_total, right_total), length, winner in zip(rewards.tolist(), rally.tolist(), winners.tolist()):
+                metrics.record(int(left_total), int(right_total), length, "left" if winner == 0 else "right")
+
+        # Log progress
+        if episode % log_interval == 0 and metrics:
+            metrics.log()
+        elif episode % log_interval == 0 and keep_history:
+            avg_left = sum(left_rewards[-log_interval:]) / log_interval
+            avg_right = sum(right_rewards[-log_interval:]) / log_interval
+            print(f"Episode {episode}: Avg Left Reward: {avg_left}, Avg Right Reward: {avg_right}")
+
+        if checkpoint_writer and episode % checkpoint_interval == 0:
+            if metrics:
+                metrics.flush()  # The CSV file holds every episode of the checkpoint
+            checkpoint_writer.save(episode, agent_left, agent_right, left_rewards, right_rewards, env)
+
+    return left_rewards, right_rewards
@@ -0,0 +1,125 @@
+"""
+Curriculum training: each agent first plays the scripted opponents of MultiplayerPongEnv, from
+easy to hard, and the two agents move to self-play once they beat the current level.
+
+In a scripted stage the episodes alternate between the left agent against a scripted right
+paddle and the right agent against a scripted left paddle, so only the learning agent is updated
+at each step. An episode is won by the learner when the scripted paddle misses, or when the rally
+reaches max_steps. A stage ends when both agents reach promote_win_rate over their last ``window``
+episodes, or after max_stage_episodes episodes.
+"""
+from collections import deque
+from training.train_double import train_double_agent
+
+STAGES = ("easy", "medium", "hard")
+
+
+def play_scripted_episode(env, agent, side, max_steps=1000):
+    """
+    Plays one training episode of an agent against the scripted AI of env.difficulty.
+    :param side: Side of the learning agent, "left" or "right" (the AI plays the other one).
+    :param max_steps: Steps after which the rally is stopped and counted as won by the learner.
+    :return: Tuple (left total reward, right total reward, rally length, learner won).
+    """
+    state = env.reset()
+    left_total_reward = 0
+    right_total_reward = 0
+    ai_side = "right" if side == "left" else "left"
+    done = False
+
+    for step in range(max_steps):
+        action = agent.get_action(state)
+        ai_action = env._get_ai_action(ai_side)
+        actions = (action, ai_action) if side == "left" else (ai_action, action)
+
+        next_state, (left_reward, right_reward), done, _ = env.step(actions)
+
+        # Only the learning agent is updated
+        agent.observe(state, action, left_reward if side == "left" else right_reward, next_state, done)
+
+        left_total_reward += left_reward
+        right_total_reward += right_reward
+        state = next_state
+        if done:
+            break
+
+    if not done:
+        return left_total_reward, right_total_reward, step + 1, True
+    won = left_reward > right_reward if side == "left" else right_reward > left_reward
+    return left_total_reward, right_total_reward, step + 1, won
+
+
+def train_curriculum(env, agent_left, agent_right, episodes, stages=STAGES, promote_win_rate=0.5, window=500,
+                     max_stage_episodes=None, max_steps=1000, log_interval=1000, metrics=None, keep_history=True,
+                     backend="python", profiler=None):
+    """
+    Trains two agents against the scripted opponents, then in self-play for the remaining episodes.
+
+    :param env: The multiplayer environment (its difficulty is changed stage by stage).
+    :param agent_left: Left paddle agent.
+    :param agent_right: Right paddle agent.
+    :param episodes: Total number of episodes, scripted stages and self-play together.
+    :param stages: Difficulty levels played in order.
+    :param promote_win_rate: Win rate over the last ``window`` episodes of each agent that ends a stage.
+    :param window: Episodes per agent of the rolling win rate.
+    :param max_stage_episodes: Maximum episodes of a stage (defaults to an equal share of the
+                               episodes between the stages and self-play).
+    :param max_steps: Steps after which a scripted rally is counted as won by the learner.
+    :param log_interval: Interval for logging progress.
+    :param metrics: Optional MetricsSink receiving every episode, scripted ones included.
+    :param keep_history: If False, the per-episode reward lists are not kept (use metrics instead).
+    :param backend: Backend of the self-play phase, see train_double_agent.
+    :param profiler: Optional TrainingProfiler of the self-play phase, see train_double_agent.
+    :return: Tuple of (left_rewards, right_rewards).
+    """
+    if max_stage_episodes is None:
+        max_stage_episodes = episodes // (len(stages) + 1)
+    left_rewards = []
+    right_rewards = []
+    episode = 0
+    difficulty = env.difficulty
+
+    for stage in stages:
+        env.difficulty = stage
+        wins = {"left": deque(maxlen=window), "right": deque(maxlen=window)}
+        stage_episode = 0
+        left_rate = right_rate = 0.0
+
+        while stage_episode < max_stage_episodes and episode < episodes:
+            side = "left" if stage_episode % 2 == 0 else "right"
+            agent = agent_left if side == "left" else agent_right
+            left_total_reward, right_total_reward, rally_length, won = play_scripted_episode(env, agent, side, max_steps)
+            wins[side].append(won)
+            stage_episode += 1
+            episode += 1
+
+            if keep_history:
+                left_rewards.append(left_total_reward)
+                right_rewards.append(right_total_reward)
+            if metrics:
+                winner = side if won else ("right" if side == "left" else "left")
+                metrics.record(left_total_reward, right_total_reward, rally_length, winner)
+
+            left_rate = sum(wins["left"]) / max(1, len(wins["left"]))
+            right_rate = sum(wins["right"]) / max(1, len(wins["right"]))
+            if episode % log_interval == 0:
+                print(f"Episode {episode} [{stage}]: Left Win Rate: {left_rate:.2f}, Right Win Rate: {right_rate:.2f}")
+            if (len(wins["left"]) == window and len(wins["right"]) == window
+                    and left_rate >= promote_win_rate and right_rate >= promote_win_rate):
+                break
+
+        print(f"Stage {stage} ended after {stage_episode} episodes "
+              f"(win rates: left {left_rate:.2f}, right {right_rate:.2f})")
+
+    env.difficulty = difficulty
+    if episode >= episodes:
+        if metrics:
+            metrics.flush()
+        return left_rewards, right_rewards
+
+    print(f"Self-play from episode {episode}")
+    self_play_left, self_play_right = train_double_agent(
+        env, agent_left, agent_right, episodes - episode, log_interval=log_interval, metrics=metrics,
+        keep_history=keep_history, backend=backend, profiler=profiler,
+    )
+    return left_rewards + self_play_left, right_rewards + self_play_right
@@ -0,0 +1,149 @@
+"""
+Opt-in per-phase profiling of the training loop.
+
+attach() replaces, on the instances only, the methods the loop calls (env.step, the
+discretizer of the environment, get_action and observe of both agents) with timed wrappers;
+detach() removes them again. The loop itself is not changed, so a run without a profiler pays
+nothing. Calls nest as they do in the code (a SARSA observe selects its next action, env.step
+discretizes the new state), and every phase is charged its self time under its call path, like
+the frames of a flame graph.
+
+Every log interval the profiler prints the time per step of each phase and the growth of each
+Q-table (new dictionary entries, or newly visited cells of a dense table). The trace file holds
+the whole run in the collapsed-stack format of flamegraph.pl and speedscope, one
+"train;env.step;discretize <microseconds>" line per call path.
+"""
+import time
+from collections import defaultdict
+import numpy as np
+
+
+def table_size(agent):
+    """
+    Returns the number of Q-table entries of a dictionary agent, or of visited cells of a dense one.
+    """
+    if agent.dense:
+        return int(np.count_nonzero(agent.visit_count.values))
+    return len(agent.q_table)
+
+
+class TrainingProfiler:
+    """
+    Times the phases of train_double_agent (python backend) and counts the Q-table growth.
+    """
+    def __init__(self, trace_path=None):
+        """
+        :param trace_path: Collapsed-stack file written by close() (None only prints the intervals).
+        """
+        self.trace_path = trace_path
+        self.totals = defaultdict(int)  # call path -> self time in ns, whole run
+        self._interval = defaultdict(int)  # call path -> self time in ns, current interval
+        self._stack = []  # [path, start, time of the children] of the calls in progress
+        self._wrappers = []  # (object, attribute name, timed wrapper) installed by attach
+        self._agents = {}
+        self._sizes = {}
+        self._started = None
+        self._interval_started = None
+        self._interval_steps = 0
+
+    def attach(self, env, agent_left, agent_right):
+        """
+        Wraps the methods of the environment and of both agents.
+        """
+        self._wrap(env, "step", "env.step")
+        self._wrap(env.discretizer, "state_id" if env.state_ids else "discretize", "discretize")
+        self._agents = {"left": agent_left} if agent_left is agent_right else {"left": agent_left, "right": agent_right}
+        for side, agent in self._agents.items():
+            self._wrap(agent, "get_action", f"{side}.get_action")
+            self._wrap(agent, "observe", f"{side}.observe")
+        self._sizes = {side: table_size(agent) for side, agent in self._agents.items()}
+        self._started = self._interval_started = time.perf_counter_ns()
+
+    def detach(self):
+        """
+        Restores the original methods, e.g. while the agents are pickled for a checkpoint (the
+        wrappers are local functions and cannot be pickled); reattach() installs them again.
+        """
+        for obj, name, _ in self._wrappers:
+            if name in vars(obj):
+                delattr(obj, name)
+
+    def reattach(self):
+        """
+        Installs again the wrappers removed by detach().
+        """
+        for obj, name, timed in self._wrappers:
+            setattr(obj, name, timed)
+
+    def log(self, episode):
+        """
+        Prints the breakdown of the interval that ends at ``episode`` and starts a new one.
+        """
+        now = time.perf_counter_ns()
+        elapsed = now - self._interval_started
+        steps = max(1, self._interval_steps)
+        by_phase = defaultdict(int)
+        for path, ns in self._interval.items():
+            by_phase[path.rsplit(";", 1)[-1]] += ns
+        loop = elapsed - sum(by_phase.values())  # Everything the wrappers do not cover
+        phases = ", ".join(
+            f"{phase} {ns / steps / 1000:.2f}us ({100 * ns / elapsed:.0f}%)"
+            for phase, ns in sorted(by_phase.items(), key=lambda item: -item[1])
+        )
+        growth = []
+        for side, agent in self._agents.items():
+            size = table_size(agent)
+            growth.append(f"{side} Q-table {size} (+{size - self._sizes[side]})")
+            self._sizes[side] = size
+        print(
+            f"Episode {episode} profile: {elapsed / steps / 1000:.2f}us/step over {self._interval_steps} steps, "
+            f"{phases}, loop {loop / steps / 1000:.2f}us ({100 * loop / elapsed:.0f}%); {', '.join(growth)}"
+        )
+        self._interval.clear()
+        self._interval_steps = 0
+        self._interval_started = now
+
+    def close(self):
+        """
+        Restores the methods and writes the trace file, if any.
+        """
+        self.detach()
+        self._wrappers = []
+        if not self.trace_path or self._started is None:
+            return
+        total = time.perf_counter_ns() - self._started
+        with open(self.trace_path, "w") as f:
+            f.write(f"train {max(0, total - sum(self.totals.values())) // 1000}\n")  # Self time of the loop
+            for path, ns in sorted(self.totals.items()):
+                f.write(f"train;{path} {ns // 1000}\n")
+
+    def _wrap(self, obj, name, phase):
+        method = getattr(obj, name)
+        stack = self._stack
+        totals = self.totals
+        interval = self._interval
+        clock = time.perf_counter_ns
+        counts_steps = phase == "env.step"
+        paths = {}  # path of the caller -> path of this call, built once
+
+        def timed(*args, **kwargs):
+            parent = stack[-1][0] if stack else None
+            path = paths.get(parent)
+            if path is None:
+                path = paths[parent] = f"{parent};{phase}" if parent else phase
+            frame = [path, clock(), 0]
+            stack.append(frame)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - frame[1]
+                stack.pop()
+                totals[path] += elapsed - frame[2]
+                interval[path] += elapsed - frame[2]
+                if stack:
+                    stack[-1][2] += elapsed
+                if counts_steps:
+                    self._interval_steps += 1
+
+        setattr(obj, name, timed)
+        self._wrappers.append((obj, name, timed))
@@ -0,0 +1,227 @@
+"""
+Hyperparameter sweeps: grid or random search over the agent parameters and the discretizer bins.
+
+Every trial trains a fresh pair of agents in self-play inside a worker process and is scored by
+the rolling mean of the combined reward of both paddles (hits per episode, since a miss gives
++1/-1). Trials report their score every ``eval_interval`` episodes; a trial whose score is more
+than ``stop_margin`` below the median that other trials reported at the same episode is stopped
+early (median stopping rule). The leaderboard is written as CSV and JSON and the models of the
+best trial are saved into models/.
+
+Usage: python -m training.sweep --search random --trials 24 --episodes 50000 --workers 8
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing as mp
+import os
+import statistics
+import time
+import numpy as np
+from agents.model_files import AGENT_CLASSES
+from environments.pong_environment import MultiplayerPongEnv
+from training.train_double import train_double_agent
+from utils.metrics import MetricsSink
+from utils.parameters import Q_Parameters, SARSA_Parameters, SWEEP_Space
+
+LEADERBOARD_COLUMNS = ["trial", "score", "status", "episodes", "alpha", "gamma", "epsilon_decay", "alpha_decay", "bins", "seconds"]
+
+_reports = None  # Shared list of (episode, trial, score) reports, set by the pool initializer
+
+
+def _init_worker(reports):
+    global _reports
+    _reports = reports
+
+
+def grid_configs(space):
+    """
+    Returns every combination of the values in a search space.
+    :param space: Dict parameter -> list of values (see SWEEP_Space).
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_configs(space, trials, seed=0):
+    """
+    Samples ``trials`` configurations, picking every parameter uniformly among its values.
+    """
+    rng = np.random.default_rng(seed)
+    return [{key: values[rng.integers(len(values))] for key, values in space.items()} for _ in range(trials)]
+
+
+def bins_for(grid_partitions):
+    """
+    Bins per dimension for a number of grid partitions, with the layout of _BINS_PER_DIMENSION.
+    """
+    return [grid_partitions, grid_partitions, 2, 2, grid_partitions, grid_partitions]
+
+
+def make_agents(config, left_agent_type="qlearning", right_agent_type="sarsa", dense=True):
+    """
+    Builds the two agents of a trial: the default parameters of each type, overridden by the config.
+    """
+    overrides = {key: value for key, value in config.items() if key != "bins"}
+    agents = []
+    for agent_type in (left_agent_type, right_agent_type):
+        defaults = Q_Parameters if agent_type == "qlearning" else SARSA_Parameters
+        params = dict(defaults, **overrides)
+        agents.append(AGENT_CLASSES[agent_type](**params, dense=dense, bins_per_dimension=bins_for(config["bins"])))
+    return agents
+
+
+def should_stop(reports, trial, episode, score, stop_margin, min_reports):
+    """
+    Median stopping rule: True if ``score`` is more than ``stop_margin`` below the median of the
+    scores other trials reported at the same episode (and at least ``min_reports`` of them exist).
+    """
+    others = [other_score for other_episode, other_trial, other_score in reports
+              if other_episode == episode and other_trial != trial]
+    if len(others) < min_reports:
+        return False
+    return score < statistics.median(others) - stop_margin
+
+
+def run_trial(args):
+    """
+    Trains one configuration in the worker process, reporting the rolling score every eval_interval episodes.
+    :param args: Tuple (trial, config, options) where options holds the keyword arguments of run_sweep.
+    :return: Dict with the leaderboard row and, for completed trials, the trained agents.
+    """
+    trial, config, options = args
+    # Independent streams for the environment and both agents of every trial
+    env_seed, left_seed, right_seed = np.random.SeedSequence([options["seed"], trial]).spawn(3)
+
+    env = MultiplayerPongEnv(headless=True, bins_per_dimension=bins_for(config["bins"]), seed=env_seed)
+    agent_left, agent_right = make_agents(config, options["left_agent_type"], options["right_agent_type"], options["dense"])
+    agent_left.set_seed(left_seed)
+    agent_right.set_seed(right_seed)
+    metrics = MetricsSink(window=options["window"])
+    start = time.perf_counter()
+
+    status = "completed"
+    score = 0.0
+    episode = 0
+    while episode < options["episodes"]:
+        chunk = min(options["eval_interval"], options["episodes"] - episode)
+        train_double_agent(
+            env, agent_left, agent_right, episodes=chunk, log_interval=chunk + 1,
+            metrics=metrics, keep_history=False, backend=options["backend"],
+        )
+        episode += chunk
+
+        stats = metrics.summary()
+        score = stats["mean_left_reward"] + stats["mean_right_reward"]
+        if _reports is not None:
+            stop = should_stop(_reports[:], trial, episode, score, options["stop_margin"], options["min_reports"])
+            _reports.append((episode, trial, score))
+            if stop and episode < options["episodes"]:
+                status = "stopped"
+                break
+
+    row = dict(config, trial=trial, score=round(score, 4), status=status, episodes=episode,
+               seconds=round(time.perf_counter() - start, 1))
+    agents = (agent_left, agent_right) if status == "completed" else None
+    return {"row": row, "agents": agents}
+
+
+def write_leaderboard(rows, output_dir):
+    """
+    Writes the rows sorted by score to leaderboard.csv and leaderboard.json in output_dir.
+    :return: The sorted rows.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rows = sorted(rows, key=lambda row: (row["status"] != "completed", -row["score"]))
+    with open(os.path.join(output_dir, "leaderboard.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=LEADERBOARD_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(output_dir, "leaderboard.json"), "w") as f:
+        json.dump(rows, f, indent=2)
+    return rows
+
+
+def run_sweep(configs, episodes, eval_interval=1000, num_workers=None, left_agent_type="qlearning",
+              right_agent_type="sarsa", dense=True, backend="python", window=1000, stop_margin=0.5,
+              min_reports=3, seed=0, output_dir="results/sweep", save_best=True):
+    """
+    Runs every configuration as a trial in a process pool and writes the leaderboard.
+
+    :param configs: List of configurations (see grid_configs / random_configs).
+    :param episodes: Training episodes per trial.
+    :param eval_interval: Episodes between two score reports (and early-stopping decisions).
+    :param num_workers: Number of worker processes (defaults to the number of CPUs).
+    :param left_agent_type: "qlearning" or "sarsa".
+    :param right_agent_type: "qlearning" or "sarsa".
+    :param dense: Train dense agents (needed by backend="numba").
+    :param backend: Training backend passed to train_double_agent.
+    :param window: Episodes of the rolling score.
+    :param stop_margin: How far below the median score a trial may fall before it is stopped.
+    :param min_reports: Reports of other trials needed at an episode before stopping anyone.
+    :param seed: Base seed; trial i uses streams spawned from SeedSequence([seed, i]).
+    :param output_dir: Directory of leaderboard.csv / leaderboard.json.
+    :param save_best: Save the agents of the best completed trial into models/.
+    :return: The leaderboard rows, best first.
+    """
+    options = {
+        "episodes": episodes, "eval_interval": eval_interval, "left_agent_type": left_agent_type,
+        "right_agent_type": right_agent_type, "dense": dense, "backend": backend, "window": window,
+        "stop_margin": stop_margin, "min_reports": min_reports, "seed": seed,
+    }
+    num_workers = num_workers or mp.cpu_count()
+    rows = []
+    best = None
+
+    with mp.Manager() as manager:
+        reports = manager.list()
+        with mp.Pool(num_workers, initializer=_init_worker, initargs=(reports,)) as pool:
+            jobs = [(trial, config, options) for trial, config in enumerate(configs)]
+            for result in pool.imap_unordered(run_trial, jobs):
+                row = result["row"]
+                rows.append(row)
+                print(f"Trial {row['trial']} {row['status']} after {row['episodes']} episodes: Score: {row['score']} ({len(rows)}/{len(configs)})")
+                # Only the agents of the best completed trial are kept in memory
+                if result["agents"] and (best is None or row["score"] > best[0]["score"]):
+                    best = (row, result["agents"])
+
+    rows = write_leaderboard(rows, output_dir)
+
+    if save_best and best:
+        row, (agent_left, agent_right) = best
+        for agent, agent_type, side in ((agent_left, left_agent_type, "left"), (agent_right, right_agent_type, "right")):
+            model_path = f"models/{agent_type}_models/{agent_type}_sweep_{episodes}_{side}.pkl"
+            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+            agent.save(model_path)
+        print(f"Best trial {row['trial']} (bins {row['bins']}) saved to models/{{type}}_models/*_sweep_{episodes}_*.pkl")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep over SWEEP_Space.")
+    parser.add_argument("--search", choices=["grid", "random"], default="random")
+    parser.add_argument("--trials", type=int, default=24, help="Trials of a random search")
+    parser.add_argument("--episodes", type=int, default=50000, help="Training episodes per trial")
+    parser.add_argument("--eval-interval", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--left-agent", choices=list(AGENT_CLASSES), default="qlearning")
+    parser.add_argument("--right-agent", choices=list(AGENT_CLASSES), default="sarsa")
+    parser.add_argument("--backend", choices=["python", "numba"], default="python")
+    parser.add_argument("--stop-margin", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="results/sweep")
+    args = parser.parse_args()
+
+    configs = grid_configs(SWEEP_Space) if args.search == "grid" else random_configs(SWEEP_Space, args.trials, args.seed)
+    rows = run_sweep(
+        configs, args.episodes, eval_interval=args.eval_interval, num_workers=args.workers,
+        left_agent_type=args.left_agent, right_agent_type=args.right_agent, backend=args.backend,
+        stop_margin=args.stop_margin, seed=args.seed, output_dir=args.output,
+    )
+    for row in rows[:5]:
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-def test_double_agent(env, agent_left, agent_right, episodes, render=False, log_interval=10, plot_path=None, user_mode=False):
+from utils.async_renderer import AsyncRenderer
+from utils.metrics import episode_winner
+
+
+def test_double_agent(env, agent_left, agent_right, episodes, render=False, log_interval=10, plot_path=None, user_mode=False,
+                      metrics=None, keep_history=True, async_render=False):
     """
     Test two agents in a multiplayer environment.
 
@@ -9,46 +14,69 @@ def test_double_agent(env, agent_left, agent_right, episodes, render=False, log_
     :param render: Whether to render the environment during testing.
     :param log_interval: Interval for logging progress.
     :param plot_path: Path to save testing rewards plot.
+    :param metrics: Optional MetricsSink receiving every episode; logs then show its rolling statistics.
+    :param keep_history: If False, the per-episode reward lists are not kept (use metrics instead).
+    :param async_render: With render=True, evaluate at full speed and draw the latest state from a
+                         separate thread (AsyncRenderer) instead of rendering every step at 30 fps.
+                         Ignored in user mode, where the game must run at human speed.
     :return: Tuple of (left_rewards, right_rewards).
     """
     left_rewards = []
     right_rewards = []
+    renderer = AsyncRenderer() if render and async_render and not user_mode and not env.headless else None
+
+    try:
+        for episode in range(episodes):
+            state = env.reset()
+            left_total_reward = 0
+            right_total_reward = 0
+            rally_length = 0
+            done = False
+
+            while not done:
+                # Agents choose their actions (exploitation only)
+                left_action = agent_left.get_best_action(state)
+                if(not user_mode):
+                    right_action = agent_right.get_best_action(state)
+                else:
+                    right_action = env._get_user_action()
+
+                # Step the environment with both actions
+                next_state, (left_reward, right_reward), done, _ = env.step((left_action, right_action))
+
+                # Accumulate rewards
+                left_total_reward += left_reward
+                right_total_reward += right_reward
+
+                # Move to the next state
+                state = next_state
+                rally_length += 1
+
+                # Render the environment if enabled
+                if renderer:
+                    renderer.publish(env)
+                elif render:
+                    env.render()
+
+            if keep_history:
+                left_rewards.append(left_total_reward)
+                right_rewards.append(right_total_reward)
+            if metrics:
+                metrics.record(left_total_reward, right_total_reward, rally_length, episode_winner(left_reward, right_reward))
+
+            # Log progress
+            if (episode + 1) % log_interval == 0 and metrics:
+                metrics.log()
+            elif (episode + 1) % log_interval == 0 and keep_history:
+                avg_left = sum(left_rewards[-log_interval:]) / log_interval
+                avg_right = sum(right_rewards[-log_interval:]) / log_interval
+                print(f"Episode {episode + 1}: Avg Left Reward: {avg_left}, Avg Right Reward: {avg_right}")
+    finally:
+        if renderer:
+            renderer.close()  # Also when the loop raises, so the render thread never outlives the evaluation
+            print(f"Rendered {renderer.rendered} of {renderer.published} steps ({renderer.dropped} frames dropped)")
 
-    for episode in range(episodes):
-        state = env.reset()
-        left_total_reward = 0
-        right_total_reward = 0
-        done = False
-
-        while not done:
-            # Agents choose their actions (exploitation only)
-            left_action = agent_left.get_best_action(state)
-            if(not user_mode):
-                right_action = agent_right.get_best_action(state)
-            else:
-                right_action = env._get_user_action()
-
-            # Step the environment with both actions
-            next_state, (left_reward, right_reward), done, _ = env.step((left_action, right_action))
-
-            # Accumulate rewards
-            left_total_reward += left_reward
-            right_total_reward += right_reward
-
-            # Move to the next state
-            state = next_state
-
-            # Render the environment if enabled
-            if render:
-                env.render()
-
-        left_rewards.append(left_total_reward)
-        right_rewards.append(right_total_reward)
-
-        # Log progress
-        if (episode + 1) % log_interval == 0:
-            avg_left = sum(left_rewards[-log_interval:]) / log_interval
-            avg_right = sum(right_rewards[-log_interval:]) / log_interval
-            print(f"Episode {episode + 1}: Avg Left Reward: {avg_left}, Avg Right Reward: {avg_right}")
+    if metrics:
+        metrics.flush()
 
     return left_rewards, right_rewards
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Headless round-robin tournament between the saved models.
+
+Every model is loaded once, in the parent process, through BaseAgent.load; the worker processes
+receive the agents when the pool starts, not with every match. A model only knows how to play
+the side it was trained on (the state includes both paddles), so each model saved for the left
+side plays each model saved for the right side. All matches use the same seed, so every pairing
+faces the same serves, and agents play greedily as in test_double_agent, without rendering.
+
+The results are a left win-rate matrix, the average rally lengths and Elo ratings, written as
+CSV and JSON.
+
+Usage: python -m training.tournament --episodes 200 --workers 8
+"""
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+from agents.model_files import AGENT_CLASSES, scan_models
+from agents.policy_agent import PolicyAgent, is_policy_file
+from environments.pong_environment import MultiplayerPongEnv
+
+MATCH_COLUMNS = ["left", "right", "left_wins", "right_wins", "draws", "left_win_rate", "mean_rally_length"]
+ELO_START = 1500
+ELO_K = 32
+
+_worker_envs = {}  # bins per dimension -> environment, created on the first match that uses them
+_worker_agents = None  # name -> agent, set once per worker by the pool initializer
+_worker_dense = True
+
+
+def _init_worker(agents, dense):
+    global _worker_agents, _worker_dense
+    _worker_agents = agents
+    _worker_dense = dense
+
+
+def load_models(models, dense=True):
+    """
+    Loads every model once.
+    :param dense: Load into dense Q-tables (fixed memory per model, faster greedy lookups).
+    :return: Dict name -> agent.
+    """
+    agents = {}
+    for model in models:
+        if is_policy_file(model["path"]):
+            agents[model["name"]] = PolicyAgent(model["path"])
+            continue
+        agent = AGENT_CLASSES[model["agent_type"]](dense=dense)
+        agent.load(model["path"])
+        agents[model["name"]] = agent
+    return agents
+
+
+def play_match(env, agent_left, agent_right, episodes, seed, max_steps=10000):
+    """
+    Plays a seeded match with greedy agents.
+    :param max_steps: Steps after which an endless rally is counted as a draw.
+    :return: Tuple (left wins, right wins, draws, total rally length).
+    """
+    left_wins = right_wins = draws = total_rally = 0
+    for episode in range(episodes):
+        state = env.reset(seed=seed if episode == 0 else None)
+        for step in range(max_steps):
+            left_action = agent_left.get_best_action(state)
+            right_action = agent_right.get_best_action(state)
+            state, (left_reward, right_reward), done, _ = env.step((left_action, right_action))
+            if done:
+                break
+        total_rally += step + 1
+        if not done:
+            draws += 1
+        elif left_reward > right_reward:
+            left_wins += 1
+        else:
+            right_wins += 1
+    return left_wins, right_wins, draws, total_rally
+
+
+def _run_match(args):
+    left_name, right_name, episodes, seed, max_steps = args
+    agent_left, agent_right = _worker_agents[left_name], _worker_agents[right_name]
+    bins = tuple(agent_left.bins_per_dimension)
+    if bins not in _worker_envs:
+        _worker_envs[bins] = MultiplayerPongEnv(headless=True, state_ids=_worker_dense, bins_per_dimension=list(bins))
+    result = play_match(_worker_envs[bins], agent_left, agent_right, episodes, seed, max_steps)
+    return left_name, right_name, result
+
+
+def elo_ratings(matches, names):
+    """
+    Elo ratings from match results, updated match by match in round-robin order.
+    The score of a match is the win fraction of its episodes, draws counting half.
+    :param matches: List of dicts with left, right, left_wins, right_wins and draws.
+    :return: Dict name -> rating.
+    """
+    ratings = {name: float(ELO_START) for name in names}
+    for match in matches:
+        left, right = match["left"], match["right"]
+        games = match["left_wins"] + match["right_wins"] + match["draws"]
+        score = (match["left_wins"] + 0.5 * match["draws"]) / games
+        expected = 1 / (1 + 10 ** ((ratings[right] - ratings[left]) / 400))
+        ratings[left] += ELO_K * (score - expected)
+        ratings[right] -= ELO_K * (score - expected)
+    return ratings
+
+
+def write_results(matches, ratings, left_names, right_names, output_dir):
+    """
+    Writes matches.csv, win_rates.csv (left win rate, rows = left models), rally_lengths.csv,
+    elo.csv and tournament.json into output_dir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    by_pair = {(match["left"], match["right"]): match for match in matches}
+
+    with open(os.path.join(output_dir, "matches.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MATCH_COLUMNS)  # Header even without matches
+        writer.writeheader()
+        writer.writerows(matches)
+
+    for filename, column in (("win_rates.csv", "left_win_rate"), ("rally_lengths.csv", "mean_rally_length")):
+        with open(os.path.join(output_dir, filename), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["left \\ right"] + right_names)
+            for left in left_names:
+                writer.writerow([left] + [by_pair[(left, right)][column] if (left, right) in by_pair else "" for right in right_names])
+
+    ranking = sorted(ratings.items(), key=lambda item: -item[1])
+    with open(os.path.join(output_dir, "elo.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["model", "elo"])
+        writer.writerows((name, round(rating, 1)) for name, rating in ranking)
+
+    with open(os.path.join(output_dir, "tournament.json"), "w") as f:
+        json.dump({"elo": dict(ranking), "matches": matches}, f, indent=2)
+
+
+def run_tournament(episodes=100, num_workers=None, seed=0, max_steps=10000, dense=True, model_dirs=None,
+                   output_dir="results/tournament"):
+    """
+    Plays every left model against every right model in a process pool and writes the results.
+
+    :param episodes: Episodes per match.
+    :param num_workers: Number of worker processes (defaults to the number of CPUs).
+    :param seed: Seed of every match, so all pairings see the same serves.
+    :param max_steps: Steps after which a rally is stopped and counted as a draw.
+    :param dense: Load the models into dense Q-tables.
+    :param model_dirs: Dict agent type -> directory (defaults to agents.model_files.MODEL_DIRS).
+    :param output_dir: Directory of the result files.
+    :return: Tuple (matches, ratings).
+    """
+    models = scan_models(model_dirs)
+    left_names = [model["name"] for model in models if model["side"] == "left"]
+    right_names = [model["name"] for model in models if model["side"] == "right"]
+    agents = load_models(models, dense)
+    print(f"Loaded {len(agents)} models: {len(left_names)} left, {len(right_names)} right")
+
+    # Models trained on different discretizations cannot share an environment
+    jobs = [
+        (left, right, episodes, seed, max_steps) for left in left_names for right in right_names
+        if list(agents[left].bins_per_dimension) == list(agents[right].bins_per_dimension)
+    ]
+    skipped = len(left_names) * len(right_names) - len(jobs)
+    if skipped:
+        print(f"Skipped {skipped} pairings between models with different bins per dimension")
+    if not jobs:
+        print("No pairings to play: the tournament needs a left and a right model with the same bins")
+    results = {}
+    num_workers = num_workers or mp.cpu_count()
+    with mp.Pool(num_workers, initializer=_init_worker, initargs=(agents, dense)) as pool:
+        for left, right, result in pool.imap_unordered(_run_match, jobs):
+            results[(left, right)] = result
+            print(f"{left} vs {right}: {result[0]}-{result[1]} ({result[2]} draws) [{len(results)}/{len(jobs)}]")
+
+    matches = []
+    for left, right, _, _, _ in jobs:  # Round-robin order, independent of the completion order
+        left_wins, right_wins, draws, total_rally = results[(left, right)]
+        matches.append({
+            "left": left,
+            "right": right,
+            "left_wins": left_wins,
+            "right_wins": right_wins,
+            "draws": draws,
+            "left_win_rate": round(left_wins / episodes, 4),
+            "mean_rally_length": round(total_rally / episodes, 2),
+        })
+    ratings = elo_ratings(matches, left_names + right_names)
+    write_results(matches, ratings, left_names, right_names, output_dir)
+    return matches, ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between the saved models.")
+    parser.add_argument("--episodes", type=int, default=100, help="Episodes per match")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=10000, help="Rally length counted as a draw")
+    parser.add_argument("--output", default="results/tournament")
+    args = parser.parse_args()
+
+    _, ratings = run_tournament(args.episodes, args.workers, args.seed, args.max_steps, output_dir=args.output)
+    for name, rating in sorted(ratings.items(), key=lambda item: -item[1]):
+        print(f"{rating:7.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 
-def train_double_agent(env, agent_left, agent_right, episodes, log_interval=100, plot_path=None,user_mode=False):
+from training.checkpoint import CheckpointWriter, load_checkpoint
+from training.compiled_backend import compiled_backend_available, train_compiled
+from utils.metrics import episode_winner
+
+
+def train_double_agent(env, agent_left, agent_right, episodes, log_interval=100, plot_path=None,user_mode=False,
+                       checkpoint_dir=None, checkpoint_interval=10000, resume=False, metrics=None, keep_history=True,
+                       backend="python", profiler=None):
     """
     Train two agents simultaneously in the environment.
 
@@ -9,47 +16,112 @@ def train_double_agent(env, agent_left, agent_right, episodes, log_interval=100,
     :param episodes: Number of episodes for training.
     :param log_interval: Interval for logging progress.
     :param plot_path: Path to save training rewards plot.
+    :param checkpoint_dir: If set, both agents and the RNG states are checkpointed there every
+                           checkpoint_interval episodes (written in the background).
+    :param checkpoint_interval: Episodes between two checkpoints.
+    :param resume: Continue from the checkpoint in checkpoint_dir, if any.
+    :param metrics: Optional MetricsSink receiving every episode; logs then show its rolling statistics.
+    :param keep_history: If False, the per-episode reward lists are not kept (use metrics instead).
+    :param backend: "python", or "numba" to run whole episodes in the compiled kernel of
+                    training.compiled_backend (dense agents, self-play, no state_ranges; falls back to Python
+                    with a warning otherwise).
+    :param profiler: Optional training.profiler.TrainingProfiler: per-phase timings and Q-table growth
+                     are printed every log_interval episodes (python backend only: with it the numba
+                     backend falls back to Python).
     :return: Tuple of (left_rewards, right_rewards).
     """
     left_rewards = []
     right_rewards = []
+    start_episode = 0
+
+    checkpoint_writer = None
+    if checkpoint_dir:
+        if resume:
+            restored = load_checkpoint(checkpoint_dir, agent_left, agent_right, env)
+            if restored:
+                start_episode, left_rewards, right_rewards = restored
+        checkpoint_writer = CheckpointWriter(checkpoint_dir)
+    if resume and metrics:
+        metrics.resume(start_episode)  # Episode numbers continue from the checkpoint
+
+    if backend == "numba" and compiled_backend_available(agent_left, agent_right, user_mode, env, profiler):
+        left_rewards, right_rewards = train_compiled(
+            env, agent_left, agent_right, episodes, log_interval, start_episode, left_rewards, right_rewards,
+            checkpoint_writer, checkpoint_interval, metrics, keep_history,
+        )
+        if checkpoint_writer:
+            checkpoint_writer.close()
+        if metrics:
+            metrics.flush()
+        return left_rewards, right_rewards
+
+    if profiler:
+        profiler.attach(env, agent_left, agent_right)
+
+    try:
+        for episode in range(start_episode, episodes):
+            state = env.reset()
+            left_total_reward = 0
+            right_total_reward = 0
+            rally_length = 0
+            done = False
+
+            while not done:
+                # Choose actions for both agents
+                left_action = agent_left.get_action(state)
+
+                if(not user_mode):
+                    right_action = agent_right.get_action(state)
+                else:
+                    right_action = env._get_user_action()
 
-    for episode in range(episodes):
-        state = env.reset()
-        left_total_reward = 0
-        right_total_reward = 0
-        done = False
+                # Take actions in the environment
+                next_state, (left_reward, right_reward), done, _ = env.step((left_action, right_action))
 
-        while not done:
-            # Choose actions for both agents
-            left_action = agent_left.get_action(state)
+                # Update both agents
+                agent_left.observe(state, left_action, left_reward, next_state, done)
+                agent_right.observe(state, right_action, right_reward, next_state, done)
 
-            if(not user_mode):
-                right_action = agent_right.get_action(state)
-            else:
-                right_action = env._get_user_action()
+                # Accumulate rewards
+                left_total_reward += left_reward
+                right_total_reward += right_reward
 
-            # Take actions in the environment
-            next_state, (left_reward, right_reward), done, _ = env.step((left_action, right_action))
+                # Move to the next state
+                state = next_state
+                rally_length += 1
 
-            # Update both agents
-            agent_left.observe(state, left_action, left_reward, next_state)
-            agent_right.observe(state, right_action, right_reward, next_state)
+            if keep_history:
+                left_rewards.append(left_total_reward)
+                right_rewards.append(right_total_reward)
+            if metrics:
+                metrics.record(left_total_reward, right_total_reward, rally_length, episode_winner(left_reward, right_reward))
 
-            # Accumulate rewards
-            left_total_reward += left_reward
-            right_total_reward += right_reward
+            # Log progress
+            if (episode + 1) % log_interval == 0 and metrics:
+                metrics.log()
+            elif (episode + 1) % log_interval == 0 and keep_history:
+                avg_left = sum(left_rewards[-log_interval:]) / log_interval
+                avg_right = sum(right_rewards[-log_interval:]) / log_interval
+                print(f"Episode {episode + 1}: Avg Left Reward: {avg_left}, Avg Right Reward: {avg_right}")
+            if (episode + 1) % log_interval == 0 and profiler:
+                profiler.log(episode + 1)
 
-            # Move to the next state
-            state = next_state
+            if checkpoint_writer and (episode + 1) % checkpoint_interval == 0:
+                if metrics:
+                    metrics.flush()  # The CSV file holds every episode of the checkpoint
+                if profiler:
+                    profiler.detach()  # The timed wrappers cannot be pickled
+                checkpoint_writer.save(episode + 1, agent_left, agent_right, left_rewards, right_rewards, env)
+                if profiler:
+                    profiler.reattach()
+    finally:
+        if profiler:
+            profiler.close()  # Never leaves the agents and the environment patched
 
-        left_rewards.append(left_total_reward)
-        right_rewards.append(right_total_reward)
+    if checkpoint_writer:
+        checkpoint_writer.close()
 
-        # Log progress
-        if (episode + 1) % log_interval == 0:
-            avg_left = sum(left_rewards[-log_interval:]) / log_interval
-            avg_right = sum(right_rewards[-log_interval:]) / log_interval
-            print(f"Episode {episode + 1}: Avg Left Reward: {avg_left}, Avg Right Reward: {avg_right}")
+    if metrics:
+        metrics.flush()
 
     return left_rewards, right_rewards
\ No newline at end of file
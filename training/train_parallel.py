@@ -0,0 +1,124 @@
+import multiprocessing as mp
+import numpy as np
+from environments.pong_environment import MultiplayerPongEnv
+from training.train_double import train_double_agent
+
+_worker_env = None  # One environment per worker process, created by the pool initializer
+
+
+def _init_worker(state_ids=False, bins_per_dimension=None):
+    global _worker_env
+    _worker_env = MultiplayerPongEnv(headless=True, state_ids=state_ids, bins_per_dimension=bins_per_dimension)
+
+
+def _run_worker(args):
+    """
+    Trains private copies of both agents for one merge round inside a worker process.
+    :param args: Tuple (agent_left, agent_right, episodes, seed_sequence).
+    :return: Tuple (agent_left, agent_right, left_rewards, right_rewards).
+    """
+    agent_left, agent_right, episodes, seed_sequence = args
+    # Independent streams for the environment and both agents of this worker and round
+    env_seed, left_seed, right_seed = seed_sequence.spawn(3)
+    _worker_env.reset(seed=env_seed)
+    agent_left.set_seed(left_seed)
+    agent_right.set_seed(right_seed)
+    left_rewards, right_rewards = train_double_agent(
+        _worker_env, agent_left, agent_right, episodes=episodes, log_interval=episodes + 1
+    )
+    return agent_left, agent_right, left_rewards, right_rewards
+
+
+def merge_agents(agent, worker_agents):
+    """
+    Merges the Q-tables learned by the workers into ``agent`` in place.
+    Each Q-value becomes the average of the worker values weighted by the visits each worker
+    added to that (state, action) during the round; cells no worker visited are left untouched.
+    :param agent: Agent holding the tables broadcast at the start of the round.
+    :param worker_agents: Copies of ``agent`` trained independently by the workers.
+    """
+    if agent.dense:
+        base_visits = agent.visit_count.values.astype(np.int64)
+        weighted_q = np.zeros(agent.q_table.values.shape, dtype=np.float64)
+        new_visits = np.zeros(base_visits.shape, dtype=np.int64)
+        for worker in worker_agents:
+            delta = worker.visit_count.values.astype(np.int64) - base_visits
+            weighted_q += delta * worker.q_table.values
+            new_visits += delta
+        visited = new_visits > 0
+        agent.q_table.values[visited] = weighted_q[visited] / new_visits[visited]
+        agent.visit_count.values[:] = base_visits + new_visits
+    else:
+        weighted_q = {}
+        new_visits = {}
+        for worker in worker_agents:
+            for key, visits in worker.visit_count.items():
+                delta = visits - agent.visit_count.get(key, 0)
+                if delta > 0:
+                    weighted_q[key] = weighted_q.get(key, 0.0) + delta * worker.q_table[key]
+                    new_visits[key] = new_visits.get(key, 0) + delta
+        for key, visits in new_visits.items():
+            agent.q_table[key] = weighted_q[key] / visits
+            agent.visit_count[key] += visits
+
+    # Time-dependent parameters continue from the total work done by all workers
+    base_steps = agent.steps_done
+    base_alpha = agent.alpha
+    for worker in worker_agents:
+        agent.steps_done += worker.steps_done - base_steps
+        if base_alpha > 0:
+            agent.alpha *= worker.alpha / base_alpha
+    agent.alpha = max(agent.alpha_end, agent.alpha)
+
+
+def train_parallel(agent_left, agent_right, episodes, num_workers=None, merge_interval=1000, log_interval=1000, seed=0):
+    """
+    Train two agents with several worker processes, merging their Q-tables periodically.
+
+    Every round each worker receives a copy of the merged agents, plays ``merge_interval``
+    episodes in its own MultiplayerPongEnv and sends its tables back; the tables are then merged
+    with a visit-weighted average (see ``merge_agents``) and broadcast again.
+
+    :param agent_left: Left paddle agent, updated in place.
+    :param agent_right: Right paddle agent, updated in place.
+    :param episodes: Total number of episodes over all workers.
+    :param num_workers: Number of worker processes (defaults to the number of CPUs).
+    :param merge_interval: Episodes played by each worker between two merges.
+    :param log_interval: Interval for logging progress.
+    :param seed: Base seed; every worker and round gets independent streams spawned from it (SeedSequence).
+    :return: Tuple of (left_rewards, right_rewards).
+    """
+    num_workers = num_workers or mp.cpu_count()
+    left_rewards = []
+    right_rewards = []
+
+    seed_sequence = np.random.SeedSequence(seed)
+    # Dense agents play on integer state ids, with the discretization of their tables
+    initargs = (agent_left.dense and agent_right.dense, list(agent_left.bins_per_dimension))
+    with mp.Pool(num_workers, initializer=_init_worker, initargs=initargs) as pool:
+        next_log = log_interval
+        while len(left_rewards) < episodes:
+            remaining = episodes - len(left_rewards)
+            per_worker = [min(merge_interval, max(0, remaining - i * merge_interval)) for i in range(num_workers)]
+            worker_seeds = seed_sequence.spawn(num_workers)
+            # Agents are pickled for every job, so each worker trains its own copy
+            jobs = [
+                (agent_left, agent_right, count, worker_seeds[i])
+                for i, count in enumerate(per_worker) if count > 0
+            ]
+            results = pool.map(_run_worker, jobs)
+
+            merge_agents(agent_left, [result[0] for result in results])
+            merge_agents(agent_right, [result[1] for result in results])
+            for _, _, worker_left, worker_right in results:
+                left_rewards.extend(worker_left)
+                right_rewards.extend(worker_right)
+
+            # Log progress
+            while log_interval and len(left_rewards) >= next_log:
+                avg_left = sum(left_rewards[next_log - log_interval:next_log]) / log_interval
+                avg_right = sum(right_rewards[next_log - log_interval:next_log]) / log_interval
+                print(f"Episode {next_log}: Avg Left Reward: {avg_left}, Avg Right Reward: {avg_right}")
+                next_log += log_interval
+
+    return left_rewards, right_rewards
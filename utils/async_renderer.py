@@ -0,0 +1,80 @@
+import threading
+
+
+class AsyncRenderer:
+    """
+    Renderer asincrono: disegna l'ultimo stato pubblicato dalla simulazione su un thread separato.
+
+    La simulazione pubblica ogni passo con publish(), che si limita a sostituire una tupla
+    immutabile (l'assegnazione di un riferimento è atomica, quindi non servono lock); il thread
+    di rendering disegna a ``fps`` frame al secondo lo stato più recente e salta quelli intermedi.
+    Tutte le chiamate a Pygame avvengono nel thread di rendering (su macOS Pygame richiede il
+    thread principale, lì usare il rendering sincrono di env.render()).
+    """
+    def __init__(self, visualizer=None, fps=30):
+        """
+        :param visualizer: Visualizer da usare (creato nel thread di rendering se None).
+        :param fps: Frame al secondo disegnati al massimo.
+        """
+        self.visualizer = visualizer
+        self.fps = fps
+
+        self._snapshot = None  # Ultimo stato pubblicato: (ball_x, ball_y, left_paddle_y, right_paddle_y)
+        self.published = 0
+        self.rendered = 0
+        self.closed = False
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def publish(self, env):
+        """
+        Pubblica lo stato corrente dell'ambiente; non blocca mai la simulazione.
+        :param env: MultiplayerPongEnv (o un oggetto con le stesse posizioni di palla e racchette).
+        """
+        self._snapshot = (env.ball_x, env.ball_y, env.left_paddle_y, env.right_paddle_y)
+        self.published += 1
+
+    @property
+    def dropped(self):
+        """
+        Numero di stati pubblicati e mai disegnati.
+        """
+        return max(0, self.published - self.rendered)
+
+    def close(self):
+        """
+        Ferma il thread di rendering e chiude la finestra.
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        import pygame
+        if self.visualizer is None:
+            from utils.visualizer import Visualizer
+            self.visualizer = Visualizer()
+        clock = pygame.time.Clock()
+
+        last = None
+        try:
+            while not self._stop.is_set():
+                snapshot = self._snapshot
+                if snapshot is None:
+                    clock.tick(self.fps)
+                    continue
+                if snapshot is not last:
+                    self.rendered += 1
+                    last = snapshot
+                # Visualizer.render limita già a 30 fps; il clock copre un fps più basso
+                ball_x, ball_y, left_paddle_y, right_paddle_y = snapshot
+                self.visualizer.render((ball_x, ball_y), left_paddle_y, right_paddle_y)
+                clock.tick(self.fps)
+        except SystemExit:
+            # Visualizer.close() chiama sys.exit() quando la finestra viene chiusa: la valutazione continua senza rendering
+            self.closed = True
+            return
+        if self.visualizer.window is not None:
+            pygame.display.quit()
+            self.visualizer.window = None
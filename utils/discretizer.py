@@ -1,15 +1,45 @@
-import numpy as np
 import math
+import numpy as np
 
 class Discretizer:
     """
     Classe per discretizzare stati continui in discreti.
+
+    Gli stati discreti possono essere anche codificati in un unico intero (mixed-radix su
+    bins_per_dimension, con un intervallo in più per lato come in DenseQTable), utilizzabile
+    direttamente come indice di un array.
     """
-    def __init__(self, bins_per_dimension):
+    def __init__(self, bins_per_dimension, ranges=None):
         """
         :param bins_per_dimension: Lista con il numero di intervalli per ogni dimensione dello stato.
+        :param ranges: Lista opzionale di coppie (minimo, massimo) per ogni dimensione. Senza ranges ogni
+                       valore viene moltiplicato per il numero di intervalli (comportamento dei modelli
+                       salvati); con ranges l'intervallo [minimo, massimo] viene diviso in bins parti e
+                       i valori esterni finiscono nel primo o nell'ultimo intervallo.
         """
         self.bins_per_dimension = bins_per_dimension
+        self.ranges = ranges
+
+        # Bordi degli intervalli precalcolati: indice = floor((valore - low) * scale)
+        bins = np.asarray(bins_per_dimension, dtype=np.float32)
+        if ranges is None:
+            self._low = np.zeros(len(bins_per_dimension), dtype=np.float32)
+            self._scale = bins
+        else:
+            low, high = np.asarray(ranges, dtype=np.float32).T
+            self._low = low
+            self._scale = bins / (high - low)
+
+        # Codifica intera: ogni dimensione va da -1 a bins (bins + 2 valori)
+        self._radix = [bins + 2 for bins in bins_per_dimension]
+        self._strides = np.array(
+            [int(np.prod(self._radix[i + 1:])) for i in range(len(self._radix))], dtype=np.int64
+        )
+        self._max_index = np.array(bins_per_dimension, dtype=np.int64) - (0 if ranges is None else 1)
+        # Per state_id: (radice, minimo, massimo) di ogni cifra già spostata di +1
+        minimum = 0 if ranges is None else 1
+        self._digits = [(size, minimum, int(high) + 1) for size, high in zip(self._radix, self._max_index)]
+        self.num_states = int(np.prod(self._radix))
 
     def discretize(self, continuous_state):
         """
@@ -17,15 +47,80 @@ class Discretizer:
         :param continuous_state: Array numpy con lo stato continuo.
         :return: Tupla con lo stato discretizzato.
         """
-        discrete_state = []
-        for value, bins in zip(continuous_state, self.bins_per_dimension):
-            discrete_value = math.floor(value * bins)
-            discrete_state.append(discrete_value)
-        return tuple(discrete_state)
+        return tuple(self.discretize_batch(continuous_state).tolist())
+
+    def discretize_batch(self, continuous_states):
+        """
+        Discretizza uno o più stati continui in un'unica operazione vettoriale.
+        :param continuous_states: Array numpy (dimensioni,) o (N, dimensioni) in float32.
+        :return: Array numpy di interi con la stessa forma, con gli stati discretizzati.
+        """
+        if self.ranges is None:
+            # Stesso prodotto in float32 del calcolo scalare originale, i modelli salvati restano validi
+            return np.floor(continuous_states * self._scale).astype(np.int64)
+        discrete = np.floor((continuous_states - self._low) * self._scale).astype(np.int64)
+        return np.clip(discrete, 0, self._max_index)
+
+    def encode(self, discrete_state):
+        """
+        Codifica uno stato discreto (tupla) o un batch (array N x dimensioni) nel suo id intero.
+        I valori fuori dall'intervallo [-1, bins] vengono saturati.
+        :return: Intero (o array di interi) tra 0 e num_states - 1.
+        """
+        if isinstance(discrete_state, tuple):
+            index = 0
+            for value, size in zip(discrete_state, self._radix):
+                value += 1
+                if value < 0:
+                    value = 0
+                elif value >= size:
+                    value = size - 1
+                index = index * size + value
+            return index
+        discrete = np.clip(discrete_state, -1, np.asarray(self.bins_per_dimension)) + 1
+        return discrete @ self._strides
+
+    def decode(self, state_id):
+        """
+        Inverso di encode per un singolo id.
+        :return: Tupla con lo stato discretizzato.
+        """
+        state = []
+        for size in reversed(self._radix):
+            state_id, value = divmod(state_id, size)
+            state.append(value - 1)
+        return tuple(reversed(state))
+
+    def state_id(self, continuous_state):
+        """
+        Discretizza e codifica uno stato continuo, senza passare da tuple usate come chiavi: un solo
+        prodotto in float32 (come discretize_batch), poi floor, saturazione e codifica in aritmetica
+        scalare. Stesso risultato di encode(discretize(...)).
+        :return: Id intero dello stato.
+        """
+        if self.ranges is not None:
+            continuous_state = continuous_state - self._low
+        index = 0
+        for value, (size, minimum, maximum) in zip((continuous_state * self._scale).tolist(), self._digits):
+            value = math.floor(value) + 1
+            if value < minimum:
+                value = minimum
+            elif value > maximum:
+                value = maximum
+            index = index * size + value
+        return index
+
+    def state_ids(self, continuous_states):
+        """
+        Discretizza e codifica un batch di stati continui.
+        :param continuous_states: Array numpy (N, dimensioni) in float32.
+        :return: Array numpy (N,) di id interi.
+        """
+        return self.encode(self.discretize_batch(continuous_states))
 
     def get_state_space_size(self):
         """
         Calcola la dimensione dello spazio discreto totale.
         :return: Lista delle dimensioni dello spazio discreto per ogni variabile.
         """
-        return [bins for bins in self.bins_per_dimension]
\ No newline at end of file
+        return [bins for bins in self.bins_per_dimension]
@@ -0,0 +1,158 @@
+import csv
+import os
+import time
+from collections import deque
+
+METRIC_COLUMNS = ["episode", "left_reward", "right_reward", "winner", "rally_length", "elapsed"]
+
+
+class MetricsSink:
+    """
+    Streaming per-episode metrics with fixed memory.
+
+    Rolling statistics (mean rewards, left win rate, rally length) are kept over the last
+    ``window`` episodes with running sums; rows are buffered and appended to a CSV file every
+    ``flush_interval`` episodes, so nothing grows with the length of the run.
+
+    A fresh run truncates the CSV file. A resumed run keeps it until resume() tells it the episode
+    of the checkpoint, so the episode numbers continue instead of restarting from 1.
+    """
+    def __init__(self, path=None, window=100, flush_interval=1000, resume=False):
+        """
+        :param path: CSV file to write (None keeps only the rolling statistics).
+        :param window: Number of episodes of the rolling statistics.
+        :param flush_interval: Episodes buffered before each write to disk.
+        :param resume: Keep the existing rows until resume() is called (training resumed from a checkpoint).
+        """
+        self.path = path
+        self.window = window
+        self.flush_interval = flush_interval
+
+        self.episodes = 0
+        self.total_steps = 0
+        self._recent = deque(maxlen=window)  # (left_reward, right_reward, left_won, rally_length)
+        self._sums = [0.0, 0.0, 0, 0]
+        self._rows = []
+
+        self._start_time = time.perf_counter()
+        self._last_time = self._start_time
+        self._last_steps = 0
+        self.steps_per_sec = 0.0
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if not resume or not os.path.exists(path) or os.path.getsize(path) == 0:
+                self._write_rows([])
+
+    def resume(self, episode):
+        """
+        Continues from a checkpoint: drops the rows after ``episode``, so the file holds one row per
+        episode, and refills the rolling statistics from the last kept rows.
+        :param episode: Number of completed episodes restored from the checkpoint (0 if none).
+        """
+        rows = []
+        if self.path and os.path.exists(self.path):
+            with open(self.path, newline="") as f:
+                rows = [row for row in csv.DictReader(f) if int(row["episode"]) <= episode]
+            self._write_rows([[row[column] for column in METRIC_COLUMNS] for row in rows])
+
+        self.episodes = episode
+        self._recent.clear()
+        self._sums = [0.0, 0.0, 0, 0]
+        for row in rows[-self.window:]:
+            entry = (float(row["left_reward"]), float(row["right_reward"]), int(row["winner"] == "left"), int(row["rally_length"]))
+            self._recent.append(entry)
+            for i, value in enumerate(entry):
+                self._sums[i] += value
+        if rows:
+            self._start_time = time.perf_counter() - float(row["elapsed"])  # Elapsed times continue too
+
+    def record(self, left_reward, right_reward, rally_length, winner):
+        """
+        Adds one finished episode.
+        :param left_reward: Total reward of the left agent.
+        :param right_reward: Total reward of the right agent.
+        :param rally_length: Number of steps played in the episode.
+        :param winner: "left", "right" or "" if nobody scored.
+        """
+        self.episodes += 1
+        self.total_steps += rally_length
+
+        entry = (left_reward, right_reward, int(winner == "left"), rally_length)
+        if len(self._recent) == self.window:
+            for i, value in enumerate(self._recent[0]):
+                self._sums[i] -= value
+        self._recent.append(entry)
+        for i, value in enumerate(entry):
+            self._sums[i] += value
+
+        if self.path:
+            elapsed = round(time.perf_counter() - self._start_time, 3)
+            self._rows.append((self.episodes, left_reward, right_reward, winner, rally_length, elapsed))
+            if len(self._rows) >= self.flush_interval:
+                self.flush()
+
+    def summary(self):
+        """
+        Returns the rolling statistics and the throughput since the previous call.
+        """
+        now = time.perf_counter()
+        if now > self._last_time:
+            self.steps_per_sec = (self.total_steps - self._last_steps) / (now - self._last_time)
+        self._last_time = now
+        self._last_steps = self.total_steps
+
+        count = max(1, len(self._recent))
+        return {
+            "episode": self.episodes,
+            "mean_left_reward": self._sums[0] / count,
+            "mean_right_reward": self._sums[1] / count,
+            "left_win_rate": self._sums[2] / count,
+            "mean_rally_length": self._sums[3] / count,
+            "steps_per_sec": self.steps_per_sec,
+        }
+
+    def log(self):
+        """
+        Prints the rolling statistics in the same style as the training logs.
+        """
+        stats = self.summary()
+        print(
+            f"Episode {stats['episode']}: Avg Left Reward: {stats['mean_left_reward']:.3f}, "
+            f"Avg Right Reward: {stats['mean_right_reward']:.3f}, Left Win Rate: {stats['left_win_rate']:.2f}, "
+            f"Avg Rally: {stats['mean_rally_length']:.1f}, Steps/s: {stats['steps_per_sec']:.0f}"
+        )
+
+    def flush(self):
+        """
+        Appends the buffered rows to the CSV file.
+        """
+        if self.path and self._rows:
+            with open(self.path, "a", newline="") as f:
+                csv.writer(f).writerows(self._rows)
+            self._rows = []
+
+    def close(self):
+        self.flush()
+
+    def _write_rows(self, rows):
+        # Rewritten through a temporary file, like the checkpoints
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(METRIC_COLUMNS)
+            writer.writerows(rows)
+        os.replace(temp_path, self.path)
+
+
+def episode_winner(left_reward, right_reward):
+    """
+    Returns the winner from the rewards of the last step of an episode.
+    """
+    if left_reward > right_reward:
+        return "left"
+    if right_reward > left_reward:
+        return "right"
+    return ""
@@ -6,6 +6,8 @@ _ACTIONS = [_STAY, _MOVE_UP, _MOVE_DOWN]
 
 # Grid partitions for state discretization
 _GRID_PARTITIONS = 12  # Number of bins for discretization
+_BINS_PER_DIMENSION = [_GRID_PARTITIONS, _GRID_PARTITIONS, 2, 2, _GRID_PARTITIONS, _GRID_PARTITIONS]  # ball x/y, velocity x/y, paddles
+_STATE_RANGES = [(0, 1), (0, 1), (-0.1, 0.1), (-0.1, 0.1), (0, 0.8), (0, 0.8)]  # Optional Discretizer ranges (velocity bins split on the sign)
 
 SARSA_Parameters = {
     "epsilon_start": 0.9,
@@ -27,6 +29,28 @@ Q_Parameters = {
     "alpha_decay": 0.9999     # Decadimento estremamente lento
 }
 
+# Experience replay for QLearningAgent(dense=True, replay=True)
+REPLAY_Parameters = {
+    "replay_capacity": 100000,  # Transizioni conservate nel ring buffer
+    "replay_batch_size": 32,    # Transizioni ripassate per ogni aggiornamento
+    "replay_interval": 1,       # Passi dell'ambiente tra due aggiornamenti dal buffer
+}
+
+# Eligibility traces for QLambdaAgent / SARSALambdaAgent
+LAMBDA_Parameters = {
+    "trace_lambda": 0.9,      # Decadimento delle tracce (0 equivale all'aggiornamento a un passo)
+    "trace_length": 64,       # Coppie (stato, azione) tracciate al massimo, costo per passo limitato
+}
+
+# Search space of training/sweep.py (grid or random search over these values)
+SWEEP_Space = {
+    "alpha": [0.05, 0.15, 0.3],
+    "gamma": [0.95, 0.99],
+    "epsilon_decay": [50000, 200000, 500000],
+    "alpha_decay": [0.999, 0.9999],
+    "bins": [8, 12, 16],      # Partizioni della griglia per posizioni della palla e delle racchette
+}
+
 # Reward values for Pong
 REWARD_Values = {
     "hit": 1.0,               # Reward for hitting the ball
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 
@@ -13,6 +12,8 @@ def plot_metrics(metrics_dict, rolling_window=50, title="Metrics Over Episodes",
     :param ylabel: Label for the y-axis.
     :param save_path: If provided, saves the plot to this path.
     """
+    import matplotlib.pyplot as plt  # Imported here so training runs never load matplotlib
+
     plt.figure(figsize=(12, 6))
 
     for label, values in metrics_dict.items():
@@ -38,4 +39,87 @@ def plot_metrics(metrics_dict, rolling_window=50, title="Metrics Over Episodes",
         plt.savefig(save_path, bbox_inches="tight")
         print(f"Plot saved to {save_path}")
     else:
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+def read_metrics(path, offset=0, max_rows=None):
+    """
+    Reads the rows appended to a metrics CSV (see utils.metrics.MetricsSink) after a byte offset.
+    Call it again with the returned offset to read only the rows written in the meantime.
+
+    :param path: Path of the metrics CSV file.
+    :param offset: Byte offset returned by the previous call (0 to start from the header).
+    :param max_rows: Maximum number of rows to read in this call (None reads everything available).
+    :return: Tuple (columns, new_offset) where columns maps each column name to a NumPy array.
+    """
+    with open(path, "r", newline="") as f:
+        header = f.readline().strip().split(",")
+        if offset:
+            f.seek(offset)
+        rows = []
+        while max_rows is None or len(rows) < max_rows:
+            line = f.readline()
+            if not line.endswith("\n"):  # End of file, or a row still being written
+                break
+            rows.append(line.rstrip("\r\n").split(","))
+            offset = f.tell()
+        if not offset:
+            offset = f.tell()
+
+    columns = {}
+    for i, name in enumerate(header):
+        values = [row[i] for row in rows]
+        columns[name] = np.array(values) if name == "winner" else np.array(values, dtype=np.float64)
+    return columns, offset
+
+
+def plot_metrics_file(path, columns=("left_reward", "right_reward"), rolling_window=100, stride=1, chunk_rows=100000,
+                      title="Metrics Over Episodes", xlabel="Episodes", ylabel="Value", save_path=None):
+    """
+    Plots the rolling averages of columns of a metrics CSV, reading it in chunks.
+
+    :param path: Path of the metrics CSV file.
+    :param columns: Columns to plot.
+    :param rolling_window: Window size of the rolling average.
+    :param stride: Keep one point every ``stride`` episodes, to bound memory on very long runs.
+    :param chunk_rows: Rows read from the file at a time.
+    :param title: Title of the plot.
+    :param xlabel: Label for the x-axis.
+    :param ylabel: Label for the y-axis.
+    :param save_path: If provided, saves the plot to this path.
+    """
+    import matplotlib.pyplot as plt  # Imported here so training runs never load matplotlib
+
+    tails = {column: np.empty(0) for column in columns}  # Last rolling_window - 1 values of the previous chunk
+    points = {column: ([], []) for column in columns}
+    offset = 0
+    while True:
+        chunk, offset = read_metrics(path, offset, max_rows=chunk_rows)
+        if len(chunk["episode"]) == 0:
+            break
+        for column in columns:
+            values = np.concatenate([tails[column], chunk[column]])
+            if len(values) >= rolling_window:
+                cumsum = np.cumsum(np.insert(values, 0, 0.0))
+                rolling_avg = (cumsum[rolling_window:] - cumsum[:-rolling_window]) / rolling_window
+                episodes = chunk["episode"][len(chunk["episode"]) - len(rolling_avg):]
+                keep = episodes % stride == 0
+                points[column][0].append(episodes[keep])
+                points[column][1].append(rolling_avg[keep])
+            tails[column] = values[len(values) - (rolling_window - 1):] if rolling_window > 1 else np.empty(0)
+
+    plt.figure(figsize=(12, 6))
+    for column, (xs, ys) in points.items():
+        if xs:
+            plt.plot(np.concatenate(xs), np.concatenate(ys), label=f"{column} (Rolling Avg, {rolling_window})")
+
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.legend()
+    plt.grid()
+
+    if save_path:
+        plt.savefig(save_path, bbox_inches="tight")
+        print(f"Plot saved to {save_path}")
+    else:
+        plt.show()
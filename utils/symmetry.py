@@ -0,0 +1,72 @@
+import numpy as np
+
+# Dimensioni dello stato: ball_x, ball_y, velocity_x, velocity_y, left_paddle_y, right_paddle_y
+_BALL_X, _VELOCITY_X, _LEFT_PADDLE, _RIGHT_PADDLE = 0, 2, 4, 5
+
+
+class StateMirror:
+    """
+    Canonicalizzazione degli stati discreti rispetto alla simmetria del campo.
+
+    Specchiando il campo (x -> 1 - x) la racchetta destra diventa quella sinistra: ball_x e
+    velocity_x vengono riflessi e le due racchette si scambiano di ruolo. Lo stato visto dalla
+    racchetta destra, specchiato, è quello che vedrebbe la racchetta sinistra nella partita
+    speculare, quindi una sola Q-table (dal punto di vista sinistro) può giocare entrambi i lati.
+
+    La riflessione lavora direttamente sugli indici del Discretizer: ball_x viene riflessa intorno
+    al centro del campo (indice -> bins - 1 - indice), velocity_x intorno allo zero senza ranges
+    (floor(-v * bins) = -1 - floor(v * bins)) o intorno al centro dell'intervallo con ranges.
+    """
+    def __init__(self, discretizer):
+        """
+        :param discretizer: Discretizer usato dall'ambiente (stessi bins_per_dimension e ranges).
+        """
+        bins = list(discretizer.bins_per_dimension)
+        if bins[_LEFT_PADDLE] != bins[_RIGHT_PADDLE]:
+            raise ValueError("Le due racchette devono avere lo stesso numero di intervalli per essere scambiate.")
+        self._x_flip = bins[_BALL_X] - 1
+        self._vx_flip = bins[_VELOCITY_X] - 1 if discretizer.ranges is not None else -1
+
+        # Permutazione degli id codificati: ogni dimensione contribuisce all'id specchiato in modo
+        # indipendente, quindi basta sommare i contributi con np.add.outer (nessuna tabella N x dimensioni)
+        radix = [b + 2 for b in bins]
+        strides = [int(np.prod(radix[i + 1:])) for i in range(len(radix))]
+        target = {_LEFT_PADDLE: _RIGHT_PADDLE, _RIGHT_PADDLE: _LEFT_PADDLE}
+        ids = np.zeros(1, dtype=np.int64)
+        for dimension, size in enumerate(radix):
+            values = np.arange(-1, size - 1)
+            if dimension == _BALL_X:
+                values = self._x_flip - values
+            elif dimension == _VELOCITY_X:
+                values = self._vx_flip - values
+            values = np.clip(values, -1, size - 2) + 1
+            contribution = values * strides[target.get(dimension, dimension)]
+            ids = np.add.outer(ids, contribution).ravel()
+        self.ids = ids
+        self._id_list = ids.tolist()  # Accesso scalare senza scalari NumPy
+
+    def mirror(self, state):
+        """
+        Specchia uno stato discreto.
+        :param state: Tupla con lo stato discretizzato o id intero (Discretizer.state_id).
+        :return: Stato specchiato dello stesso tipo.
+        """
+        if type(state) is tuple:
+            return (self._x_flip - state[0], state[1], self._vx_flip - state[2], state[3], state[5], state[4])
+        return self._id_list[state]
+
+    def mirror_batch(self, states):
+        """
+        Specchia un batch di stati.
+        :param states: Array di id interi o array (N x dimensioni) di stati discretizzati.
+        :return: Array dello stesso formato.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        if states.ndim == 1:
+            return self.ids[states]
+        mirrored = states.copy()
+        mirrored[:, _BALL_X] = self._x_flip - states[:, _BALL_X]
+        mirrored[:, _VELOCITY_X] = self._vx_flip - states[:, _VELOCITY_X]
+        mirrored[:, _LEFT_PADDLE] = states[:, _RIGHT_PADDLE]
+        mirrored[:, _RIGHT_PADDLE] = states[:, _LEFT_PADDLE]
+        return mirrored
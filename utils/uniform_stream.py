@@ -0,0 +1,29 @@
+class UniformStream:
+    """
+    Uniform numbers in [0, 1) drawn from a numpy.random.Generator in blocks.
+
+    One NumPy call fills a block of ``block_size`` numbers, and every next() is a plain list read,
+    so the per-step cost of epsilon-greedy exploration (agents) and of the easy scripted opponent
+    (environment) stays in pure Python. The numbers are those of ``rng.random(block_size)``, block
+    after block: for a given generator state the stream is the same wherever it is used.
+    """
+    def __init__(self, rng, block_size=4096):
+        """
+        :param rng: numpy.random.Generator the blocks are drawn from (shared, not copied).
+        :param block_size: Numbers drawn per block.
+        """
+        self.rng = rng
+        self.block_size = block_size
+        self._values = []
+        self._index = 0
+
+    def next(self):
+        """
+        Returns the next uniform number in [0, 1).
+        """
+        i = self._index
+        if i == len(self._values):
+            self._values = self.rng.random(self.block_size).tolist()
+            i = 0
+        self._index = i + 1
+        return self._values[i]
@@ -1,6 +1,4 @@
 import pygame
-import matplotlib.pyplot as plt
-import numpy as np
 import sys
 
 class Visualizer:
@@ -32,6 +30,7 @@ class Visualizer:
         :param right_paddle_y: Posizione della racchetta destra (margine superiore) in coordinate normalizzate.
         """
         if self.window is None:
+            pygame.init()
             self.window = pygame.display.set_mode((self.width, self.height))
             pygame.display.set_caption("Pong Environment")
             self.clock = pygame.time.Clock()